@@ -1,4 +1,6 @@
 import storage
+import stats
+import trends
 import tkinter as tk
 from tkinter import ttk
 import os, sys
@@ -74,6 +76,8 @@ def set_status(msg, color=None):
 # State vars
 # =========================
 storage.load_data()  # fuerza creación/migración si hace falta
+indice = stats.GradeIndex.attach()  # se mantiene solo con los eventos de storage
+tendencias = trends.TrendIndex.attach()
 
 ramo_var = tk.StringVar(value=storage.get_ramo_activo())
 nivel_var = tk.StringVar(value=storage.get_nivel())
@@ -111,9 +115,13 @@ def refresh_list():
     evs = storage.get_evaluaciones(ramo_var.get())
     for ev in evs:
         if "peso" in ev:
-            listbox.insert(tk.END, f'{ev["nota"]:.2f}   —   {ev["peso"]:.2f}%')
+            linea = f'{ev["nota"]:.2f}   —   {ev["peso"]:.2f}%'
         else:
-            listbox.insert(tk.END, f'{ev["nota"]:.2f}')
+            linea = f'{ev["nota"]:.2f}'
+        extra = [x for x in (ev.get("etiqueta"), (ev.get("fecha") or "")[:10]) if x]
+        if extra:
+            linea += "   ·   " + "  ·  ".join(extra)
+        listbox.insert(tk.END, linea)
 
 def refresh_summary():
     # Promedio ramo (auto)
@@ -141,8 +149,32 @@ def refresh_summary():
             fg=(THEME["success"] if prom_g >= 4.0 else THEME["danger"])
         )
 
+    stats_ramo.config(text=stats_text(ramo_var.get()))
+    stats_global.config(text=stats_text(None))
+    trend_ramo.config(text=trend_text(ramo_var.get()))
+
     count_label.config(text=f'{len(storage.get_evaluaciones(ramo_var.get()))} evaluación(es)')
 
+def stats_text(ramo):
+    s = indice.resumen(ramo)
+    if not s["n"]:
+        return ""
+    return f'Med {s["mediana"]:.2f} · Mín {s["min"]:.1f} · Máx {s["max"]:.1f} · Rojas {s["rojas"]}'
+
+def trend_text(ramo):
+    tr = tendencias.ramo(ramo)
+    movil = tr.promedio_movil()
+    if movil is None:
+        return ""
+    txt = f"Últimas {min(tr.count(), tr.ventana)}: {movil:.2f}"
+    m = tr.pendiente()
+    if m is not None:
+        txt += f' ({"↑" if m > 0 else "↓" if m < 0 else "→"} {m:+.2f}/ev)'
+    mes, _ = tr.promedio_dias(30)
+    if mes is not None:
+        txt += f" · 30 días: {mes:.2f}"
+    return txt
+
 def refresh_all():
     refresh_ramos_dropdown(keep_current=True)
     refresh_nivel_ui()
@@ -180,13 +212,15 @@ def agregar_evaluacion():
                 peso_entry.focus_set()
                 return
 
-    ok, msg = storage.add_evaluacion(nota, peso=peso, ramo=ramo_var.get())
+    etiqueta = (etiqueta_entry.get() or "").strip() or None
+    ok, msg = storage.add_evaluacion(nota, peso=peso, ramo=ramo_var.get(), etiqueta=etiqueta)
     if not ok:
         set_status(msg, THEME["danger"])
         return
 
     nota_entry.delete(0, tk.END)
     peso_entry.delete(0, tk.END)
+    etiqueta_entry.delete(0, tk.END)
     nota_entry.focus_set()
     refresh_all()
     set_status("Evaluación agregada.", THEME["success"])
@@ -288,6 +322,10 @@ prom_ramo_big = tk.Label(ramo_box, text="—", bg=THEME["card"], fg=THEME["text"
 prom_ramo_big.pack(anchor="w")
 chip_ramo = tk.Label(ramo_box, text="SIN DATOS", bg=THEME["card"], fg=THEME["muted"], font=("Segoe UI", 10, "bold"))
 chip_ramo.pack(anchor="w")
+stats_ramo = tk.Label(ramo_box, text="", bg=THEME["card"], fg=THEME["muted"], font=FONT_SUB)
+stats_ramo.pack(anchor="w")
+trend_ramo = tk.Label(ramo_box, text="", bg=THEME["card"], fg=THEME["muted"], font=FONT_SUB)
+trend_ramo.pack(anchor="w")
 
 # Global
 global_box = tk.Frame(sumrow, bg=THEME["card"])
@@ -298,6 +336,8 @@ prom_global_big = tk.Label(global_box, text="—", bg=THEME["card"], fg=THEME["t
 prom_global_big.pack(anchor="w")
 chip_global = tk.Label(global_box, text="SIN DATOS", bg=THEME["card"], fg=THEME["muted"], font=("Segoe UI", 10, "bold"))
 chip_global.pack(anchor="w")
+stats_global = tk.Label(global_box, text="", bg=THEME["card"], fg=THEME["muted"], font=FONT_SUB)
+stats_global.pack(anchor="w")
 
 count_label = tk.Label(header_body, text="0 evaluación(es)", bg=THEME["card"], fg=THEME["muted"], font=FONT_SUB)
 count_label.pack(anchor="w", pady=(10, 0))
@@ -326,6 +366,14 @@ peso_entry.pack(fill="x", pady=(6, 6))
 peso_hint = tk.Label(input_body, text="", bg=THEME["card"], fg=THEME["muted"], font=FONT_SUB)
 peso_hint.pack(anchor="w", pady=(0, 10))
 
+tk.Label(input_body, text="Etiqueta (opcional, ej: Prueba 1)", bg=THEME["card"], fg=THEME["muted"], font=FONT_SUB).pack(anchor="w")
+etiqueta_entry = tk.Entry(
+    input_body, bg=THEME["field"], fg=THEME["text"], insertbackground=THEME["text"],
+    relief="flat", highlightthickness=1, highlightbackground=THEME["border"], highlightcolor=THEME["accent"],
+    font=("Segoe UI", 12),
+)
+etiqueta_entry.pack(fill="x", pady=(6, 10))
+
 btn_add = tk.Button(
     input_body, text="Agregar", command=agregar_evaluacion,
     bg=THEME["accent"], fg="white", activebackground=THEME["accent"], activeforeground="white",
@@ -0,0 +1,2 @@
+# Los módulos viven en la raíz del repo (storage.py, sync.py, ...):
+# este archivo hace que pytest la agregue a sys.path para los tests/.
@@ -0,0 +1,169 @@
+from fractions import Fraction
+from functools import lru_cache
+from math import floor
+from typing import Optional, Tuple, List, Iterable
+
+import storage
+
+try:
+    import numpy as np
+except ImportError:  # opcional: sin numpy se usa la ruta en Python puro
+    np = None
+
+# =========================
+# Puntaje -> nota (escala chilena 1.0–7.0)
+#   p < E·Pmax :  nota = 1 + (aprob - 1) · p / (E·Pmax)
+#   p ≥ E·Pmax :  nota = aprob + (7 - aprob) · (p - E·Pmax) / (Pmax - E·Pmax)
+# Se calcula con fracciones exactas y se redondea "al medio hacia arriba"
+# (4.45 -> 4.5), como en las planillas de los colegios.
+# =========================
+NOTA_MIN = 1.0
+NOTA_MAX = 7.0
+EXIGENCIA_DEFAULT = 0.6
+APROBACION_DEFAULT = 4.0
+
+def _frac(x) -> Fraction:
+    # vía str para que 0.6 sea 3/5 y no el float binario
+    return Fraction(str(x))
+
+def _check_config(puntaje_max: float, exigencia: float, nota_aprobacion: float) -> None:
+    if not puntaje_max > 0:
+        raise ValueError("El puntaje máximo debe ser mayor que 0.")
+    if not (0.0 < exigencia < 1.0):
+        raise ValueError("La exigencia debe estar entre 0 y 1 (ej: 0.6).")
+    if not (NOTA_MIN < nota_aprobacion < NOTA_MAX):
+        raise ValueError("La nota de aprobación debe estar entre 1.0 y 7.0.")
+
+def _redondear(x: Fraction, decimales: Optional[int]) -> float:
+    if decimales is None:
+        return float(x)
+    f = 10 ** decimales
+    return floor(x * f + Fraction(1, 2)) / f
+
+def _nota_exacta(p: Fraction, pmax: Fraction, e: Fraction, aprob: Fraction) -> Fraction:
+    corte = e * pmax
+    if p < corte:
+        return 1 + (aprob - 1) * p / corte
+    return aprob + (7 - aprob) * (p - corte) / (pmax - corte)
+
+def nota_desde_puntaje(puntaje: float, puntaje_max: float, exigencia: float = EXIGENCIA_DEFAULT,
+                       nota_aprobacion: float = APROBACION_DEFAULT, decimales: Optional[int] = 1) -> Optional[float]:
+    """Convierte un puntaje. None si el puntaje está fuera de [0, puntaje_max]."""
+    _check_config(puntaje_max, exigencia, nota_aprobacion)
+    try:
+        p = _frac(float(puntaje))
+    except (TypeError, ValueError):
+        return None
+    pmax = _frac(puntaje_max)
+    if p < 0 or p > pmax:
+        return None
+    return _redondear(_nota_exacta(p, pmax, _frac(exigencia), _frac(nota_aprobacion)), decimales)
+
+# =========================
+# Tablas precalculadas
+# Una por configuración (puntaje_max, exigencia, aprobación, decimales, paso);
+# convertir un curso completo es una búsqueda por alumno.
+# Grillas más finas que TABLA_MAX puntajes no se tabulan (la tabla costaría
+# más que convertir el curso): esos puntajes se calculan directo.
+# =========================
+TABLA_MAX = 5000
+
+def _check_paso(paso: float) -> None:
+    if not paso > 0:
+        raise ValueError("El paso debe ser mayor que 0.")
+
+@lru_cache(maxsize=64)
+def tabla_conversion(puntaje_max: float, exigencia: float = EXIGENCIA_DEFAULT,
+                     nota_aprobacion: float = APROBACION_DEFAULT, decimales: Optional[int] = 1,
+                     paso: float = 1.0) -> Tuple[float, ...]:
+    """Notas para los puntajes 0, paso, 2·paso, …, puntaje_max (a lo más TABLA_MAX + 1)."""
+    _check_config(puntaje_max, exigencia, nota_aprobacion)
+    _check_paso(paso)
+    pmax, e, aprob, d = _frac(puntaje_max), _frac(exigencia), _frac(nota_aprobacion), _frac(paso)
+    n = int(pmax / d)
+    if n > TABLA_MAX:
+        raise ValueError(f"La tabla tendría más de {TABLA_MAX} puntajes: usa un paso mayor.")
+    return tuple(_redondear(_nota_exacta(i * d, pmax, e, aprob), decimales) for i in range(n + 1))
+
+def convertir_lote(puntajes: Iterable[float], puntaje_max: float, exigencia: float = EXIGENCIA_DEFAULT,
+                   nota_aprobacion: float = APROBACION_DEFAULT, decimales: Optional[int] = 1,
+                   paso: float = 1.0):
+    """
+    Convierte muchos puntajes con la misma configuración.
+    Lista -> lista (None para puntajes inválidos).
+    numpy.ndarray -> ndarray (NaN para puntajes inválidos), sin loop en Python.
+    """
+    _check_config(puntaje_max, exigencia, nota_aprobacion)
+    _check_paso(paso)
+    if puntaje_max / paso <= TABLA_MAX:
+        tabla = tabla_conversion(puntaje_max, exigencia, nota_aprobacion, decimales, paso)
+    else:
+        tabla = ()  # grilla demasiado fina: todo por la fórmula directa
+
+    if np is not None and isinstance(puntajes, np.ndarray):
+        return _convertir_array(puntajes, tabla, puntaje_max, exigencia, nota_aprobacion, decimales, paso)
+
+    out: List[Optional[float]] = []
+    for x in puntajes:
+        try:
+            p = float(x)
+        except (TypeError, ValueError):
+            out.append(None)
+            continue
+        if not (0.0 <= p <= puntaje_max):
+            out.append(None)
+            continue
+        k = round(p / paso)
+        if abs(k * paso - p) < 1e-9 and k < len(tabla):
+            out.append(tabla[k])
+        else:
+            # fuera de la grilla (ej: 17.25 con paso 0.5): se calcula directo
+            out.append(nota_desde_puntaje(p, puntaje_max, exigencia, nota_aprobacion, decimales))
+    return out
+
+def _convertir_array(arr, tabla, puntaje_max, exigencia, nota_aprobacion, decimales, paso):
+    p = np.asarray(arr, dtype=float)
+    t = np.asarray(tabla, dtype=float)
+    validos = (p >= 0.0) & (p <= puntaje_max)
+
+    k = np.rint(p / paso)
+    en_grilla = validos & (np.abs(k * paso - p) < 1e-9) & (k < len(t))
+    out = np.full(p.shape, np.nan)
+    out[en_grilla] = t[k[en_grilla].astype(np.intp)]
+
+    resto = validos & ~en_grilla
+    if resto.any():
+        corte = exigencia * puntaje_max
+        x = p[resto]
+        nota = np.where(
+            x < corte,
+            1.0 + (nota_aprobacion - 1.0) * x / corte,
+            nota_aprobacion + (NOTA_MAX - nota_aprobacion) * (x - corte) / (puntaje_max - corte),
+        )
+        if decimales is not None:
+            f = 10.0 ** decimales
+            nota = np.floor(nota * f + 0.5 + 1e-9) / f
+        out[resto] = nota
+    return out
+
+# =========================
+# Directo al store
+# =========================
+def agregar_puntajes(puntajes: Iterable[float], puntaje_max: float, exigencia: float = EXIGENCIA_DEFAULT,
+                     nota_aprobacion: float = APROBACION_DEFAULT, decimales: Optional[int] = 1,
+                     paso: float = 1.0, ramo: Optional[str] = None, peso: Optional[float] = None,
+                     fecha=None, etiqueta: Optional[str] = None,
+                     store: Optional[storage.Store] = None) -> Tuple[bool, str]:
+    """
+    Convierte y agrega todas las notas al ramo con una sola escritura.
+    Ej: una prueba completa como "Prueba 1" en su fecha, con su peso (Uni/Post).
+    """
+    notas = convertir_lote(puntajes, puntaje_max, exigencia, nota_aprobacion, decimales, paso)
+    if np is not None and isinstance(notas, np.ndarray):
+        if np.isnan(notas).any():
+            return False, "Puntaje fuera de rango."
+        notas = notas.tolist()
+    if any(n is None for n in notas):
+        return False, "Puntaje fuera de rango."
+    return (store or storage.default_store()).add_evaluaciones(
+        notas, peso=peso, ramo=ramo, fecha=fecha, etiqueta=etiqueta)
@@ -0,0 +1,188 @@
+from bisect import bisect_left, bisect_right, insort
+from operator import itemgetter
+from typing import Optional, Tuple, List, Dict, Callable
+
+import storage
+
+# =========================
+# Índices ordenados de notas + histogramas (escala 1.0–7.0)
+# Se mantienen al día con los eventos de storage (add / delete / clear),
+# así la UI consulta mediana, percentiles, min/max, etc. sin re-escanear.
+# =========================
+NOTA_MIN = 1.0
+NOTA_MAX = 7.0
+# [1,2) [2,3) [3,4) [4,5) [5,6) [6,7]
+HIST_BORDES = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]
+NOTA_APROBACION = 4.0
+
+def _bin(nota: float) -> int:
+    i = bisect_right(HIST_BORDES, nota) - 1
+    return max(0, min(i, len(HIST_BORDES) - 2))
+
+def _percentil(orden: List, p: float, nota: Callable = float) -> Optional[float]:
+    """Interpolación lineal entre rangos (p en 0–100). `nota` saca la nota de cada elemento."""
+    if not orden:
+        return None
+    p = max(0.0, min(100.0, float(p)))
+    k = (len(orden) - 1) * p / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(orden) - 1)
+    a, b = nota(orden[lo]), nota(orden[hi])
+    return a + (b - a) * (k - lo)
+
+class GradeIndex:
+    def __init__(self):
+        self._store: Optional[storage.Store] = None
+        self._vaciar()
+
+    def _vaciar(self) -> None:
+        self._por_ramo: Dict[str, List[float]] = {}
+        self._global: List[Tuple[float, str]] = []
+        self._hist: Dict[str, List[int]] = {}
+        self._hist_global = [0] * (len(HIST_BORDES) - 1)
+
+    @classmethod
+    def from_data(cls, data: dict) -> "GradeIndex":
+        idx = cls()
+        idx.rebuild(data)
+        return idx
+
+    @classmethod
+    def attach(cls, store: Optional[storage.Store] = None) -> "GradeIndex":
+        """Construye el índice y lo suscribe a los eventos del store."""
+        store = store or storage.default_store()
+        idx = cls.from_data(store.load_data())
+        idx._store = store
+        store.subscribe(idx.on_evento)
+        return idx
+
+    def detach(self) -> None:
+        if self._store is not None:
+            self._store.unsubscribe(self.on_evento)
+            self._store = None
+
+    # ---------- mantenimiento ----------
+    def rebuild(self, data: dict) -> None:
+        self._vaciar()
+        for r, obj in data.get("ramos", {}).items():
+            notas = sorted(float(ev["nota"]) for ev in obj.get("evaluaciones", []))
+            self._por_ramo[r] = notas
+            self._hist[r] = [0] * (len(HIST_BORDES) - 1)
+            for n in notas:
+                self._hist[r][_bin(n)] += 1
+                self._hist_global[_bin(n)] += 1
+            self._global.extend((n, r) for n in notas)
+        self._global.sort()
+
+    def _add(self, ramo: str, nota: float) -> None:
+        insort(self._por_ramo.setdefault(ramo, []), nota)
+        insort(self._global, (nota, ramo))
+        self._hist.setdefault(ramo, [0] * (len(HIST_BORDES) - 1))[_bin(nota)] += 1
+        self._hist_global[_bin(nota)] += 1
+
+    def _remove(self, ramo: str, nota: float) -> None:
+        notas = self._por_ramo.get(ramo, [])
+        i = bisect_left(notas, nota)
+        if i < len(notas) and notas[i] == nota:
+            notas.pop(i)
+            self._hist[ramo][_bin(nota)] -= 1
+            self._hist_global[_bin(nota)] -= 1
+        j = bisect_left(self._global, (nota, ramo))
+        if j < len(self._global) and self._global[j] == (nota, ramo):
+            self._global.pop(j)
+
+    def _drop_ramo(self, ramo: str) -> None:
+        for n in self._por_ramo.pop(ramo, []):
+            self._hist_global[_bin(n)] -= 1
+        self._hist.pop(ramo, None)
+        self._global = [x for x in self._global if x[1] != ramo]
+
+    def on_evento(self, evento: dict) -> None:
+        tipo = evento.get("tipo")
+        r = evento.get("ramo")
+        if tipo == "add_evaluacion":
+            self._add(r, float(evento["ev"]["nota"]))
+        elif tipo == "delete_evaluacion":
+            self._remove(r, float(evento["ev"]["nota"]))
+        elif tipo == "clear_evaluaciones":
+            self._drop_ramo(r)
+            self._por_ramo[r] = []
+            self._hist[r] = [0] * (len(HIST_BORDES) - 1)
+        elif tipo == "add_ramo":
+            self._por_ramo.setdefault(r, [])
+            self._hist.setdefault(r, [0] * (len(HIST_BORDES) - 1))
+        elif tipo == "rename_ramo":
+            nuevo = evento["nuevo"]
+            self._por_ramo[nuevo] = self._por_ramo.pop(r, [])
+            self._hist[nuevo] = self._hist.pop(r, [0] * (len(HIST_BORDES) - 1))
+            self._global = sorted((n, nuevo if x == r else x) for n, x in self._global)
+        elif tipo == "delete_ramo":
+            self._drop_ramo(r)
+        elif tipo == "reset":
+            self.rebuild(evento["data"])
+
+    # ---------- consultas ----------
+    def notas(self, ramo: Optional[str] = None) -> List[float]:
+        """Notas ordenadas (del ramo o de todos)."""
+        if ramo is None:
+            return [n for n, _ in self._global]
+        return list(self._por_ramo.get(ramo, []))
+
+    def count(self, ramo: Optional[str] = None) -> int:
+        return len(self._global) if ramo is None else len(self._por_ramo.get(ramo, []))
+
+    def minimo(self, ramo: Optional[str] = None) -> Optional[float]:
+        if ramo is None:
+            return self._global[0][0] if self._global else None
+        notas = self._por_ramo.get(ramo, [])
+        return notas[0] if notas else None
+
+    def maximo(self, ramo: Optional[str] = None) -> Optional[float]:
+        if ramo is None:
+            return self._global[-1][0] if self._global else None
+        notas = self._por_ramo.get(ramo, [])
+        return notas[-1] if notas else None
+
+    def percentil(self, p: float, ramo: Optional[str] = None) -> Optional[float]:
+        if ramo is None:
+            # sin copiar la lista global: sólo se leen dos posiciones
+            return _percentil(self._global, p, itemgetter(0))
+        return _percentil(self._por_ramo.get(ramo, []), p)
+
+    def mediana(self, ramo: Optional[str] = None) -> Optional[float]:
+        return self.percentil(50.0, ramo)
+
+    def contar_rango(self, lo: float, hi: float, ramo: Optional[str] = None) -> int:
+        """Cantidad de notas en [lo, hi)."""
+        if ramo is None:
+            return bisect_left(self._global, (hi,)) - bisect_left(self._global, (lo,))
+        notas = self._por_ramo.get(ramo, [])
+        return bisect_left(notas, hi) - bisect_left(notas, lo)
+
+    def rango(self, lo: float, hi: float, ramo: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Evaluaciones con nota en [lo, hi), como (ramo, nota) ordenadas por nota."""
+        if ramo is None:
+            i, j = bisect_left(self._global, (lo,)), bisect_left(self._global, (hi,))
+            return [(r, n) for n, r in self._global[i:j]]
+        notas = self._por_ramo.get(ramo, [])
+        return [(ramo, n) for n in notas[bisect_left(notas, lo):bisect_left(notas, hi)]]
+
+    def bajo(self, umbral: float = NOTA_APROBACION, ramo: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Ej: todas las notas rojas (< 4.0) de todos los ramos."""
+        return self.rango(NOTA_MIN, umbral, ramo)
+
+    def histograma(self, ramo: Optional[str] = None) -> List[Tuple[str, int]]:
+        h = self._hist_global if ramo is None else self._hist.get(ramo, [0] * (len(HIST_BORDES) - 1))
+        etiquetas = [f"{HIST_BORDES[i]:.0f}–{HIST_BORDES[i + 1]:.0f}" for i in range(len(h))]
+        return list(zip(etiquetas, h))
+
+    def resumen(self, ramo: Optional[str] = None) -> dict:
+        return {
+            "n": self.count(ramo),
+            "min": self.minimo(ramo),
+            "max": self.maximo(ramo),
+            "mediana": self.mediana(ramo),
+            "p25": self.percentil(25.0, ramo),
+            "p75": self.percentil(75.0, ramo),
+            "rojas": self.contar_rango(NOTA_MIN, NOTA_APROBACION, ramo),
+        }
@@ -1,7 +1,11 @@
+import contextvars
+import copy
 import json
 import os
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import Optional, Tuple, List, Dict
+from typing import Optional, Tuple, List, Dict, Callable
 
 # =========================
 # Data path (SIEMPRE escribible)
@@ -15,13 +19,14 @@ def app_data_dir() -> Path:
     p.mkdir(parents=True, exist_ok=True)
     return p
 
-DATA_PATH = app_data_dir() / "data.json"
-
 RAMOS_DEFAULT = ["Matemática", "Lenguaje", "Historia", "Ciencias", "Inglés"]
 NIVELES = ["Escolar", "Universidad", "Postgrado"]
 NIVEL_DEFAULT = "Escolar"
 TOL_PESOS = 0.5  # 99.5–100.5
 
+# eventos retenidos por la operación en curso (se emiten recién al guardar)
+_retenidos: contextvars.ContextVar = contextvars.ContextVar("eventos_retenidos", default=None)
+
 # =========================
 # Base v1.2
 # =========================
@@ -33,10 +38,21 @@ def default_data_v12() -> dict:
         "ramo_activo": "Matemática",
     }
 
-def _safe_write(data: dict) -> None:
-    tmp = DATA_PATH.with_suffix(".tmp")
+# =========================
+# Base v1.3 (= v1.2 + "fecha" y "etiqueta" opcionales en cada evaluación)
+# =========================
+VERSION = "1.3"
+ETIQUETA_MAX = 60
+
+def default_data_v13() -> dict:
+    data = default_data_v12()
+    data["version"] = "1.3"
+    return data
+
+def _safe_write(data: dict, path: Path) -> None:
+    tmp = path.with_suffix(".tmp")
     tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-    tmp.replace(DATA_PATH)
+    tmp.replace(path)
 
 def _is_v11(data: dict) -> bool:
     return isinstance(data, dict) and data.get("version") == "1.1" and isinstance(data.get("notas"), list)
@@ -76,15 +92,58 @@ def _migrate_v11_to_v12(data_v11: dict) -> dict:
     base["ramo_activo"] = "Matemática"
     return base
 
-def _normalize_v12(data: dict) -> Tuple[dict, bool]:
-    """Retorna (data_normalizada, changed)."""
-    changed = False
+def parse_fecha(valor) -> Optional[str]:
+    """datetime o texto ISO -> 'YYYY-MM-DDTHH:MM:SS' (None si no sirve)."""
+    if isinstance(valor, datetime):
+        return valor.replace(microsecond=0).isoformat()
+    t = (valor or "").strip() if isinstance(valor, str) else ""
+    if not t:
+        return None
+    try:
+        return datetime.fromisoformat(t).replace(microsecond=0).isoformat()
+    except ValueError:
+        return None
 
-    if not isinstance(data, dict):
-        return default_data_v12(), True
+def _clean_ev_v12(ev) -> Optional[dict]:
+    if not isinstance(ev, dict) or "nota" not in ev:
+        return None
+    try:
+        nota = float(ev["nota"])
+    except Exception:
+        return None
+    if not (1.0 <= nota <= 7.0):
+        return None
 
-    if data.get("version") != "1.2":
-        return default_data_v12(), True
+    item = {"nota": nota}
+    if "peso" in ev and ev["peso"] is not None:
+        try:
+            peso = float(ev["peso"])
+            if 0.0 < peso <= 100.0:
+                item["peso"] = peso
+        except Exception:
+            pass
+    return item
+
+def _clean_ev_v13(ev) -> Optional[dict]:
+    item = _clean_ev_v12(ev)
+    if item is None:
+        return None
+    fecha = parse_fecha(ev.get("fecha"))
+    if fecha is not None:
+        item["fecha"] = fecha
+    etiqueta = ev.get("etiqueta")
+    if isinstance(etiqueta, str) and etiqueta.strip():
+        item["etiqueta"] = etiqueta.strip()[:ETIQUETA_MAX]
+    return item
+
+def _normalize_v12(data: dict, version: str = "1.2", clean_ev=_clean_ev_v12) -> Tuple[dict, bool]:
+    """Retorna (data_normalizada, changed). v1.3 reutiliza esto con su clean_ev."""
+    changed = False
+
+    if not isinstance(data, dict) or data.get("version") != version:
+        base = default_data_v12()
+        base["version"] = version
+        return base, True
 
     if not isinstance(data.get("perfil"), dict):
         data["perfil"] = {"nombre": "Principal", "nivel": NIVEL_DEFAULT}
@@ -129,29 +188,10 @@ def _normalize_v12(data: dict) -> Tuple[dict, bool]:
 
         clean = []
         for ev in evs:
-            if not isinstance(ev, dict) or "nota" not in ev:
+            item = clean_ev(ev)
+            if item is None:
                 changed = True
                 continue
-            try:
-                nota = float(ev["nota"])
-            except Exception:
-                changed = True
-                continue
-            if not (1.0 <= nota <= 7.0):
-                changed = True
-                continue
-
-            item = {"nota": nota}
-            if "peso" in ev and ev["peso"] is not None:
-                try:
-                    peso = float(ev["peso"])
-                    if 0.0 < peso <= 100.0:
-                        item["peso"] = peso
-                    else:
-                        changed = True
-                except Exception:
-                    changed = True
-
             clean.append(item)
 
         if clean != evs:
@@ -166,200 +206,526 @@ def _normalize_v12(data: dict) -> Tuple[dict, bool]:
 
     return data, changed
 
-def load_data() -> dict:
-    if not DATA_PATH.exists():
-        data = default_data_v12()
-        _safe_write(data)
-        return data
+def _migrate_v12_to_v13(data_v12: dict) -> dict:
+    # v1.3 sólo agrega campos opcionales: basta con subir la versión
+    data_v12["version"] = "1.3"
+    return data_v12
+
+def _clean_sync(obj) -> dict:
+    """data["sync"] = {id_local: {id_peer: {"base": {ramo: [claves]}, "enviado": {...}, "revs": {...}}}}"""
+    def claves(d) -> dict:
+        if not isinstance(d, dict):
+            return {}
+        return {r: ks for r, ks in d.items()
+                if isinstance(r, str) and isinstance(ks, list) and all(isinstance(k, str) for k in ks)}
+
+    def revs(d) -> dict:
+        if not isinstance(d, dict):
+            return {}
+        return {r: {"rev": x["rev"], "hash": x["hash"]} for r, x in d.items()
+                if isinstance(r, str) and isinstance(x, dict)
+                and type(x.get("rev")) is int and isinstance(x.get("hash"), str)}
+
+    clean = {}
+    for local, peers in (obj.items() if isinstance(obj, dict) else []):
+        if not isinstance(local, str) or not isinstance(peers, dict):
+            continue
+        clean[local] = {
+            pid: {"base": claves(p.get("base")), "enviado": claves(p.get("enviado")), "revs": revs(p.get("revs"))}
+            for pid, p in peers.items() if isinstance(pid, str) and isinstance(p, dict)
+        }
+    return clean
+
+def _normalize_v13(data: dict) -> Tuple[dict, bool]:
+    """
+    Retorna (data_normalizada, changed). Acepta v1.2 y la sube.
+    v1.3 además permite "rev" (contador de cambios) en cada ramo y una
+    sección "sync" (ver sync.py).
+    """
+    migrated = False
+    if isinstance(data, dict) and data.get("version") == "1.2":
+        data, _ = _normalize_v12(data)
+        data = _migrate_v12_to_v13(data)
+        migrated = True
+    data, changed = _normalize_v12(data, version="1.3", clean_ev=_clean_ev_v13)
+
+    for obj in data["ramos"].values():
+        if "rev" in obj and (not isinstance(obj["rev"], int) or obj["rev"] < 0):
+            obj["rev"] = 0
+            changed = True
+    if "sync" in data:
+        sync = _clean_sync(data["sync"])
+        if sync != data["sync"]:
+            data["sync"] = sync
+            changed = True
 
-    try:
-        data = json.loads(DATA_PATH.read_text(encoding="utf-8"))
-    except Exception:
-        data = default_data_v12()
-        _safe_write(data)
-        return data
+    return data, changed or migrated
+
+# =========================
+# Promedios (puros, sobre una lista de evaluaciones)
+# =========================
+def promedio_ponderado(evs: List[Dict]) -> Tuple[Optional[float], str]:
+    if not evs:
+        return None, "SIN_DATOS"
+
+    con_peso = [ev for ev in evs if isinstance(ev, dict) and "peso" in ev]
+    sin_peso = [ev for ev in evs if isinstance(ev, dict) and "peso" not in ev]
+
+    if con_peso and sin_peso:
+        return None, "INCOMPLETO"
+
+    if not con_peso:
+        notas = [float(ev["nota"]) for ev in evs if isinstance(ev, dict) and "nota" in ev]
+        if not notas:
+            return None, "SIN_DATOS"
+        return sum(notas) / len(notas), "OK"
+
+    suma = sum(float(ev["peso"]) for ev in con_peso)
+    if not (100.0 - TOL_PESOS <= suma <= 100.0 + TOL_PESOS):
+        return None, "PESOS_INVALIDOS"
+
+    prom = sum(float(ev["nota"]) * (float(ev["peso"]) / 100.0) for ev in con_peso)
+    return prom, "OK"
+
+# =========================
+# Backends
+# read() -> dict crudo (None si no existe, excepción si está corrupto)
+# write(data) -> persiste
+# stamp() -> marca que cambia cuando cambia lo guardado
+# =========================
+class FileBackend:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def read(self) -> Optional[dict]:
+        if not self.path.exists():
+            return None
+        return json.loads(self.path.read_text(encoding="utf-8"))
+
+    def write(self, data: dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        _safe_write(data, self.path)
+
+    def stamp(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def describe(self) -> str:
+        return str(self.path)
+
+class MemoryBackend:
+    """Sin disco: para tests, benchmarks o un servidor con varios perfiles."""
+
+    def __init__(self, data: Optional[dict] = None):
+        self._data = copy.deepcopy(data) if data is not None else None
+        self._rev = 0
+
+    def read(self) -> Optional[dict]:
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def write(self, data: dict) -> None:
+        self._data = copy.deepcopy(data)
+        self._rev += 1
+
+    def stamp(self) -> int:
+        return self._rev
 
-    if _is_v11(data):
-        data = _migrate_v11_to_v12(data)
-        _safe_write(data)
+    def describe(self) -> str:
+        return "<memoria>"
+
+# =========================
+# Store
+# =========================
+class Store:
+    def __init__(self, path: Optional[Path] = None, backend=None):
+        if backend is None:
+            backend = FileBackend(path if path is not None else app_data_dir() / "data.json")
+        self.backend = backend
+        self._listeners: List[Callable[[dict], None]] = []
+
+    @classmethod
+    def in_memory(cls, data: Optional[dict] = None) -> "Store":
+        return cls(backend=MemoryBackend(data))
+
+    def load_data(self) -> dict:
+        try:
+            data = self.backend.read()
+        except Exception:
+            data = None
+        if data is None:
+            data = default_data_v13()
+            self.backend.write(data)
+            return data
+
+        if _is_v11(data):
+            data = _migrate_v11_to_v12(data)
+
+        data, changed = _normalize_v13(data)
+        if changed:
+            self.backend.write(data)
         return data
 
-    data, changed = _normalize_v12(data)
-    if changed:
-        _safe_write(data)
-    return data
+    def save_data(self, data: dict) -> None:
+        data, _ = _normalize_v13(data)
+        self.backend.write(data)
+
+    def debug_data_path(self) -> str:
+        return self.backend.describe()
+
+    # ---------- Eventos de cambio ----------
+    # Cada operación exitosa avisa con un dict {"tipo": ..., "ramo": ..., ...}
+    # para que índices/estadísticas se actualicen sin releer todo.
+    def subscribe(self, listener: Callable[[dict], None]) -> None:
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[dict], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _emit(self, evento: dict) -> None:
+        cola = _retenidos.get()
+        if cola is not None:
+            cola.append(evento)
+            return
+        for fn in list(self._listeners):
+            fn(evento)
+
+    @contextmanager
+    def _retener(self):
+        """Junta los eventos de las operaciones del bloque en vez de emitirlos."""
+        cola: List[dict] = []
+        token = _retenidos.set(cola)
+        try:
+            yield cola
+        finally:
+            _retenidos.reset(token)
+
+    def _emitir(self, eventos: List[dict]) -> None:
+        for ev in eventos:
+            self._emit(ev)
+
+    def _operar(self, op, *args, **kwargs):
+        """load -> op -> save. Los eventos salen sólo si la escritura resultó."""
+        data = self.load_data()
+        with self._retener() as eventos:
+            res = op(data, *args, **kwargs)
+        ok = res[0] if isinstance(res, tuple) else res
+        if ok:
+            self.save_data(data)
+            self._emitir(eventos)
+        return res
+
+    def _touch(self, data: dict, ramo: str) -> None:
+        # contador de cambios por ramo (lo usa sync.py en los manifiestos)
+        obj = data["ramos"][ramo]
+        obj["rev"] = int(obj.get("rev", 0)) + 1
+
+    def _olvidar_revs(self, data: dict, ramo: str) -> None:
+        # sync.py guarda el hash de cada ramo según su rev; si el nombre se
+        # libera, un ramo nuevo con ese nombre podría repetir la rev
+        for peers in data.get("sync", {}).values():
+            for p in peers.values():
+                p.get("revs", {}).pop(ramo, None)
+
+    # ---------- Operaciones sobre un dict ya cargado ----------
+    # (las usan los métodos públicos y storage_async)
+    def _set_nivel(self, data: dict, nivel: str) -> bool:
+        if nivel not in NIVELES:
+            return False
+        data["perfil"]["nivel"] = nivel
+        return True
+
+    def _set_ramo_activo(self, data: dict, ramo: str) -> bool:
+        if ramo not in data.get("ramos", {}):
+            return False
+        data["ramo_activo"] = ramo
+        return True
+
+    def _add_ramo(self, data: dict, nombre: str) -> Tuple[bool, str]:
+        name = (nombre or "").strip()
+        if not name:
+            return False, "Nombre vacío."
+        if name in data["ramos"]:
+            return False, "Ese ramo ya existe."
+        data["ramos"][name] = {"evaluaciones": []}
+        self._emit({"tipo": "add_ramo", "ramo": name})
+        return True, "Ramo agregado."
+
+    def _rename_ramo(self, data: dict, old: str, new: str) -> Tuple[bool, str]:
+        old = (old or "").strip()
+        new = (new or "").strip()
+        if not old or not new:
+            return False, "Nombre inválido."
+        if old not in data["ramos"]:
+            return False, "El ramo no existe."
+        if new in data["ramos"]:
+            return False, "Ya existe un ramo con ese nombre."
+
+        data["ramos"][new] = data["ramos"].pop(old)
+        self._olvidar_revs(data, old)
+        if data.get("ramo_activo") == old:
+            data["ramo_activo"] = new
+        self._touch(data, new)
+        self._emit({"tipo": "rename_ramo", "ramo": old, "nuevo": new})
+        return True, "Ramo renombrado."
+
+    def _delete_ramo(self, data: dict, ramo: str) -> Tuple[bool, str]:
+        r = (ramo or "").strip()
+        if r not in data["ramos"]:
+            return False, "El ramo no existe."
+        if len(data["ramos"]) <= 1:
+            return False, "No puedes borrar el último ramo."
+
+        obj = data["ramos"].pop(r)
+        self._olvidar_revs(data, r)
+        if data.get("ramo_activo") == r:
+            data["ramo_activo"] = list(data["ramos"].keys())[0]
+        self._emit({"tipo": "delete_ramo", "ramo": r, "evs": obj.get("evaluaciones", [])})
+        return True, "Ramo eliminado."
+
+    def _get_evaluaciones(self, data: dict, ramo: Optional[str] = None) -> List[Dict]:
+        r = ramo or data.get("ramo_activo", "Matemática")
+        evs = data["ramos"].get(r, {}).get("evaluaciones", [])
+        return evs if isinstance(evs, list) else []
+
+    def _add_evaluacion(self, data: dict, nota: float, peso: Optional[float] = None, ramo: Optional[str] = None,
+                        fecha=None, etiqueta: Optional[str] = None) -> Tuple[bool, str]:
+        n = float(nota)
+        if not (1.0 <= n <= 7.0):
+            return False, "Nota fuera de rango."
+
+        # En escolar bloqueamos peso por seguridad
+        if data["perfil"].get("nivel") not in ("Universidad", "Postgrado") and peso is not None:
+            return False, "Escolar no usa ponderación."
+
+        r = ramo or data.get("ramo_activo", "Matemática")
+        if r not in data["ramos"]:
+            return False, "Ramo inválido."
+
+        item = {"nota": n}
+        if peso is not None:
+            p = float(peso)
+            if not (0.0 < p <= 100.0):
+                return False, "Peso inválido."
+            item["peso"] = p
+
+        # sin fecha explícita se registra el momento en que se agrega
+        f = parse_fecha(fecha if fecha is not None else datetime.now())
+        if f is None:
+            return False, "Fecha inválida."
+        item["fecha"] = f
+        if etiqueta is not None and not isinstance(etiqueta, str):
+            return False, "Etiqueta inválida."
+        if etiqueta and etiqueta.strip():
+            item["etiqueta"] = etiqueta.strip()[:ETIQUETA_MAX]
+
+        data["ramos"][r]["evaluaciones"].append(item)
+        self._touch(data, r)
+        self._emit({"tipo": "add_evaluacion", "ramo": r, "ev": item})
+        return True, "OK"
+
+    def _add_evaluaciones(self, data: dict, notas: List[float], peso: Optional[float] = None, ramo: Optional[str] = None,
+                          fecha=None, etiqueta: Optional[str] = None) -> Tuple[bool, str]:
+        # todo o nada: se valida el lote completo antes de tocar data
+        try:
+            notas = [float(n) for n in notas]
+        except (TypeError, ValueError):
+            return False, "Nota inválida."
+        if not notas:
+            return False, "No hay notas."
+        if any(not (1.0 <= n <= 7.0) for n in notas):
+            return False, "Nota fuera de rango."
+        r = ramo or data.get("ramo_activo", "Matemática")
+        if r not in data["ramos"]:
+            return False, "Ramo inválido."
+        for n in notas:
+            ok, msg = self._add_evaluacion(data, n, peso=peso, ramo=r, fecha=fecha, etiqueta=etiqueta)
+            if not ok:
+                # sólo puede fallar por peso o fecha, y falla en la primera
+                return ok, msg
+        return True, f"{len(notas)} evaluación(es) agregada(s)."
+
+    def _delete_evaluacion(self, data: dict, idx: int, ramo: Optional[str] = None) -> Tuple[bool, str]:
+        r = ramo or data.get("ramo_activo", "Matemática")
+        evs = self._get_evaluaciones(data, r)
+        if not evs:
+            return False, "No hay evaluaciones."
+        if idx < 0 or idx >= len(evs):
+            return False, "Índice inválido."
+        ev = evs.pop(idx)
+        self._touch(data, r)
+        self._emit({"tipo": "delete_evaluacion", "ramo": r, "idx": idx, "ev": ev})
+        return True, "Evaluación borrada."
+
+    def _clear_evaluaciones(self, data: dict, ramo: Optional[str] = None) -> bool:
+        r = ramo or data.get("ramo_activo", "Matemática")
+        if r not in data["ramos"]:
+            return False
+        evs = data["ramos"][r]["evaluaciones"]
+        data["ramos"][r]["evaluaciones"] = []
+        self._touch(data, r)
+        self._emit({"tipo": "clear_evaluaciones", "ramo": r, "evs": evs})
+        return True
+
+    def _promedio_global(self, data: dict) -> Tuple[Optional[float], str]:
+        proms: List[float] = []
+        for r in data.get("ramos", {}):
+            p, st = promedio_ponderado(self._get_evaluaciones(data, r))
+            if p is not None and st == "OK":
+                proms.append(p)
+        if not proms:
+            return None, "SIN_DATOS"
+        return sum(proms) / len(proms), "OK"
 
-def save_data(data: dict) -> None:
-    data, _ = _normalize_v12(data)
-    _safe_write(data)
+    # ---------- Perfil / Nivel ----------
+    def get_nivel(self) -> str:
+        return self.load_data().get("perfil", {}).get("nivel", NIVEL_DEFAULT)
+
+    def set_nivel(self, nivel: str) -> None:
+        self._operar(self._set_nivel, nivel)
+
+    def ponderacion_habilitada(self) -> bool:
+        return self.get_nivel() in ("Universidad", "Postgrado")
+
+    # ---------- Ramos CRUD ----------
+    def get_ramos(self) -> List[str]:
+        r = self.load_data().get("ramos", {})
+        return list(r.keys()) if isinstance(r, dict) else []
+
+    def get_ramo_activo(self) -> str:
+        return self.load_data().get("ramo_activo", "Matemática")
+
+    def set_ramo_activo(self, ramo: str) -> None:
+        self._operar(self._set_ramo_activo, ramo)
+
+    def add_ramo(self, nombre: str) -> Tuple[bool, str]:
+        return self._operar(self._add_ramo, nombre)
+
+    def rename_ramo(self, old: str, new: str) -> Tuple[bool, str]:
+        return self._operar(self._rename_ramo, old, new)
+
+    def delete_ramo(self, ramo: str) -> Tuple[bool, str]:
+        return self._operar(self._delete_ramo, ramo)
+
+    # ---------- Evaluaciones ----------
+    def get_evaluaciones(self, ramo: Optional[str] = None) -> List[Dict]:
+        return self._get_evaluaciones(self.load_data(), ramo)
+
+    def add_evaluacion(self, nota: float, peso: Optional[float] = None, ramo: Optional[str] = None,
+                       fecha=None, etiqueta: Optional[str] = None) -> Tuple[bool, str]:
+        return self._operar(self._add_evaluacion, nota, peso=peso, ramo=ramo, fecha=fecha, etiqueta=etiqueta)
+
+    def add_evaluaciones(self, notas: List[float], peso: Optional[float] = None, ramo: Optional[str] = None,
+                         fecha=None, etiqueta: Optional[str] = None) -> Tuple[bool, str]:
+        """Varias notas con una sola lectura/escritura."""
+        return self._operar(self._add_evaluaciones, notas, peso=peso, ramo=ramo, fecha=fecha, etiqueta=etiqueta)
+
+    def delete_evaluacion(self, idx: int, ramo: Optional[str] = None) -> Tuple[bool, str]:
+        return self._operar(self._delete_evaluacion, idx, ramo)
+
+    def clear_evaluaciones(self, ramo: Optional[str] = None) -> None:
+        self._operar(self._clear_evaluaciones, ramo)
+
+    # ---------- Promedios ----------
+    def promedio_ramo(self, ramo: Optional[str] = None) -> Tuple[Optional[float], str]:
+        return promedio_ponderado(self.get_evaluaciones(ramo))
+
+    def promedio_global(self) -> Tuple[Optional[float], str]:
+        return self._promedio_global(self.load_data())
 
 # =========================
-# Perfil / Nivel
+# Store por defecto (se crea recién al primer uso)
+# =========================
+_default_store: Optional[Store] = None
+
+def default_store() -> Store:
+    global _default_store
+    if _default_store is None:
+        _default_store = Store()
+    return _default_store
+
+def set_default_store(store: Optional[Store]) -> None:
+    """Cambia el store de las funciones de módulo (None = volver al archivo por defecto)."""
+    global _default_store
+    _default_store = store
+
+def __getattr__(name: str):
+    # compat: DATA_PATH ya no se calcula (ni crea carpetas) al importar
+    if name == "DATA_PATH":
+        return getattr(default_store().backend, "path", None)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# =========================
+# Funciones de módulo (atajos sobre el store por defecto)
 # =========================
+def load_data() -> dict:
+    return default_store().load_data()
+
+def save_data(data: dict) -> None:
+    default_store().save_data(data)
+
+def subscribe(listener: Callable[[dict], None]) -> None:
+    default_store().subscribe(listener)
+
+def unsubscribe(listener: Callable[[dict], None]) -> None:
+    default_store().unsubscribe(listener)
+
+# Perfil / Nivel
 def get_nivel() -> str:
-    return load_data().get("perfil", {}).get("nivel", NIVEL_DEFAULT)
+    return default_store().get_nivel()
 
 def set_nivel(nivel: str) -> None:
-    if nivel not in NIVELES:
-        return
-    data = load_data()
-    data["perfil"]["nivel"] = nivel
-    save_data(data)
+    default_store().set_nivel(nivel)
 
 def ponderacion_habilitada() -> bool:
-    return get_nivel() in ("Universidad", "Postgrado")
+    return default_store().ponderacion_habilitada()
 
-# =========================
 # Ramos CRUD
-# =========================
 def get_ramos() -> List[str]:
-    r = load_data().get("ramos", {})
-    return list(r.keys()) if isinstance(r, dict) else []
+    return default_store().get_ramos()
 
 def get_ramo_activo() -> str:
-    return load_data().get("ramo_activo", "Matemática")
+    return default_store().get_ramo_activo()
 
 def set_ramo_activo(ramo: str) -> None:
-    data = load_data()
-    if ramo in data.get("ramos", {}):
-        data["ramo_activo"] = ramo
-        save_data(data)
+    default_store().set_ramo_activo(ramo)
 
 def add_ramo(nombre: str) -> Tuple[bool, str]:
-    name = (nombre or "").strip()
-    if not name:
-        return False, "Nombre vacío."
-    data = load_data()
-    if name in data["ramos"]:
-        return False, "Ese ramo ya existe."
-    data["ramos"][name] = {"evaluaciones": []}
-    save_data(data)
-    return True, "Ramo agregado."
+    return default_store().add_ramo(nombre)
 
 def rename_ramo(old: str, new: str) -> Tuple[bool, str]:
-    old = (old or "").strip()
-    new = (new or "").strip()
-    if not old or not new:
-        return False, "Nombre inválido."
-    data = load_data()
-    if old not in data["ramos"]:
-        return False, "El ramo no existe."
-    if new in data["ramos"]:
-        return False, "Ya existe un ramo con ese nombre."
-
-    data["ramos"][new] = data["ramos"].pop(old)
-    if data.get("ramo_activo") == old:
-        data["ramo_activo"] = new
-    save_data(data)
-    return True, "Ramo renombrado."
+    return default_store().rename_ramo(old, new)
 
 def delete_ramo(ramo: str) -> Tuple[bool, str]:
-    r = (ramo or "").strip()
-    data = load_data()
-    if r not in data["ramos"]:
-        return False, "El ramo no existe."
-    if len(data["ramos"]) <= 1:
-        return False, "No puedes borrar el último ramo."
-
-    del data["ramos"][r]
-    if data.get("ramo_activo") == r:
-        data["ramo_activo"] = list(data["ramos"].keys())[0]
-    save_data(data)
-    return True, "Ramo eliminado."
+    return default_store().delete_ramo(ramo)
 
-# =========================
 # Evaluaciones
-# =========================
 def get_evaluaciones(ramo: Optional[str] = None) -> List[Dict]:
-    data = load_data()
-    r = ramo or data.get("ramo_activo", "Matemática")
-    evs = data["ramos"].get(r, {}).get("evaluaciones", [])
-    return evs if isinstance(evs, list) else []
-
-def add_evaluacion(nota: float, peso: Optional[float] = None, ramo: Optional[str] = None) -> Tuple[bool, str]:
-    n = float(nota)
-    if not (1.0 <= n <= 7.0):
-        return False, "Nota fuera de rango."
-
-    # En escolar bloqueamos peso por seguridad
-    if not ponderacion_habilitada() and peso is not None:
-        return False, "Escolar no usa ponderación."
-
-    data = load_data()
-    r = ramo or data.get("ramo_activo", "Matemática")
-    if r not in data["ramos"]:
-        return False, "Ramo inválido."
-
-    item = {"nota": n}
-    if peso is not None:
-        p = float(peso)
-        if not (0.0 < p <= 100.0):
-            return False, "Peso inválido."
-        item["peso"] = p
-
-    data["ramos"][r]["evaluaciones"].append(item)
-    save_data(data)
-    return True, "OK"
+    return default_store().get_evaluaciones(ramo)
+
+def add_evaluacion(nota: float, peso: Optional[float] = None, ramo: Optional[str] = None,
+                   fecha=None, etiqueta: Optional[str] = None) -> Tuple[bool, str]:
+    return default_store().add_evaluacion(nota, peso=peso, ramo=ramo, fecha=fecha, etiqueta=etiqueta)
+
+def add_evaluaciones(notas: List[float], peso: Optional[float] = None, ramo: Optional[str] = None,
+                     fecha=None, etiqueta: Optional[str] = None) -> Tuple[bool, str]:
+    return default_store().add_evaluaciones(notas, peso=peso, ramo=ramo, fecha=fecha, etiqueta=etiqueta)
 
 def delete_evaluacion(idx: int, ramo: Optional[str] = None) -> Tuple[bool, str]:
-    data = load_data()
-    r = ramo or data.get("ramo_activo", "Matemática")
-    evs = data["ramos"].get(r, {}).get("evaluaciones", [])
-    if not evs:
-        return False, "No hay evaluaciones."
-    if idx < 0 or idx >= len(evs):
-        return False, "Índice inválido."
-    evs.pop(idx)
-    save_data(data)
-    return True, "Evaluación borrada."
+    return default_store().delete_evaluacion(idx, ramo)
 
 def clear_evaluaciones(ramo: Optional[str] = None) -> None:
-    data = load_data()
-    r = ramo or data.get("ramo_activo", "Matemática")
-    if r in data["ramos"]:
-        data["ramos"][r]["evaluaciones"] = []
-        save_data(data)
+    default_store().clear_evaluaciones(ramo)
 
-# =========================
 # Promedios
-# =========================
-def promedio_ponderado(evs: List[Dict]) -> Tuple[Optional[float], str]:
-    if not evs:
-        return None, "SIN_DATOS"
-
-    con_peso = [ev for ev in evs if isinstance(ev, dict) and "peso" in ev]
-    sin_peso = [ev for ev in evs if isinstance(ev, dict) and "peso" not in ev]
-
-    if con_peso and sin_peso:
-        return None, "INCOMPLETO"
-
-    if not con_peso:
-        notas = [float(ev["nota"]) for ev in evs if isinstance(ev, dict) and "nota" in ev]
-        if not notas:
-            return None, "SIN_DATOS"
-        return sum(notas) / len(notas), "OK"
-
-    suma = sum(float(ev["peso"]) for ev in con_peso)
-    if not (100.0 - TOL_PESOS <= suma <= 100.0 + TOL_PESOS):
-        return None, "PESOS_INVALIDOS"
-
-    prom = sum(float(ev["nota"]) * (float(ev["peso"]) / 100.0) for ev in con_peso)
-    return prom, "OK"
-
 def promedio_ramo(ramo: Optional[str] = None) -> Tuple[Optional[float], str]:
-    return promedio_ponderado(get_evaluaciones(ramo))
+    return default_store().promedio_ramo(ramo)
 
 def promedio_global() -> Tuple[Optional[float], str]:
-    data = load_data()
-    ramos = list(data.get("ramos", {}).keys())
-    proms: List[float] = []
-    for r in ramos:
-        p, st = promedio_ramo(r)
-        if p is not None and st == "OK":
-            proms.append(p)
-    if not proms:
-        return None, "SIN_DATOS"
-    return sum(proms) / len(proms), "OK"
+    return default_store().promedio_global()
 
 def debug_data_path() -> str:
-    return str(DATA_PATH)
\ No newline at end of file
+    return default_store().debug_data_path()
\ No newline at end of file
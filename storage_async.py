@@ -0,0 +1,348 @@
+import asyncio
+import contextvars
+import copy
+from contextlib import asynccontextmanager
+from typing import Optional, Tuple, List, Dict
+
+import storage
+
+# =========================
+# Fachada asyncio de storage
+# - el disco se toca sólo en hilos (asyncio.to_thread)
+# - las escrituras de cada store pasan por un asyncio.Lock
+# - lectores concurrentes comparten una misma carga en vuelo
+# - varias mutaciones seguidas se guardan con UNA escritura, y cada una
+#   vuelve recién cuando esa escritura terminó (igual que storage)
+# - los eventos de cambio se emiten después de escribir
+# =========================
+# AsyncStores con una transacción abierta en este contexto (las tareas hijas lo heredan)
+_en_transaccion: contextvars.ContextVar = contextvars.ContextVar("en_transaccion", default=())
+
+class Transaccion:
+    """
+    Lo que entrega AsyncStore.transaction(): opera sobre una copia de data
+    con el lock ya tomado. Los métodos son síncronos (no hay disco acá) y sus
+    eventos quedan retenidos hasta que la transacción se escribe.
+    """
+
+    def __init__(self, store: storage.Store, data: dict):
+        self.store = store
+        self.data = data
+        self.eventos: List[dict] = []
+
+    def _op(self, op, *args, **kwargs):
+        with self.store._retener() as eventos:
+            res = op(self.data, *args, **kwargs)
+        self.eventos.extend(eventos)
+        return res
+
+    def set_nivel(self, nivel: str) -> None:
+        self._op(self.store._set_nivel, nivel)
+
+    def set_ramo_activo(self, ramo: str) -> None:
+        self._op(self.store._set_ramo_activo, ramo)
+
+    def add_ramo(self, nombre: str) -> Tuple[bool, str]:
+        return self._op(self.store._add_ramo, nombre)
+
+    def rename_ramo(self, old: str, new: str) -> Tuple[bool, str]:
+        return self._op(self.store._rename_ramo, old, new)
+
+    def delete_ramo(self, ramo: str) -> Tuple[bool, str]:
+        return self._op(self.store._delete_ramo, ramo)
+
+    def get_evaluaciones(self, ramo: Optional[str] = None) -> List[Dict]:
+        return self.store._get_evaluaciones(self.data, ramo)
+
+    def add_evaluacion(self, nota: float, peso: Optional[float] = None, ramo: Optional[str] = None,
+                       fecha=None, etiqueta: Optional[str] = None) -> Tuple[bool, str]:
+        return self._op(self.store._add_evaluacion, nota, peso=peso, ramo=ramo, fecha=fecha, etiqueta=etiqueta)
+
+    def add_evaluaciones(self, notas: List[float], peso: Optional[float] = None, ramo: Optional[str] = None,
+                         fecha=None, etiqueta: Optional[str] = None) -> Tuple[bool, str]:
+        return self._op(self.store._add_evaluaciones, notas, peso=peso, ramo=ramo, fecha=fecha, etiqueta=etiqueta)
+
+    def delete_evaluacion(self, idx: int, ramo: Optional[str] = None) -> Tuple[bool, str]:
+        return self._op(self.store._delete_evaluacion, idx, ramo)
+
+    def clear_evaluaciones(self, ramo: Optional[str] = None) -> None:
+        self._op(self.store._clear_evaluaciones, ramo)
+
+class AsyncStore:
+    """Un storage.Store servido a un event loop (Kivy, servidor web, etc.)."""
+
+    def __init__(self, store: Optional[storage.Store] = None, flush_delay: float = 0.0):
+        self.store = store or storage.default_store()
+        # cuánto esperar antes de escribir para juntar mutaciones
+        self.flush_delay = flush_delay
+        self._lock = asyncio.Lock()
+        self._data: Optional[dict] = None
+        self._stamp = None  # backend.stamp() de lo que tenemos en memoria
+        self._gen = 0  # sube con cada mutación en memoria
+        self._dirty = False
+        self._loading: Optional[asyncio.Future] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._eventos: List[dict] = []  # de las mutaciones que esperan escritura
+
+    # ---------- carga ----------
+    def _read(self) -> Tuple[dict, object]:
+        data = self.store.load_data()
+        return data, self.store.backend.stamp()
+
+    async def _load(self) -> dict:
+        gen = self._gen
+        try:
+            data, stamp = await asyncio.to_thread(self._read)
+        finally:
+            self._loading = None
+        # si alguien mutó mientras leíamos, lo de memoria es más nuevo
+        if self._gen == gen or self._data is None:
+            recarga = self._data is not None
+            self._data, self._stamp = data, stamp
+            if recarga:
+                # cambió en disco por fuera: los índices se rehacen
+                self.store._emit({"tipo": "reset", "data": data})
+        return self._data
+
+    async def _ensure_loaded(self) -> dict:
+        if self._data is not None:
+            if self._dirty or self._flush_task is not None:
+                return self._data
+            if await asyncio.to_thread(self.store.backend.stamp) == self._stamp:
+                return self._data
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._load())
+        # shield: si un lector se cancela, la carga compartida sigue
+        return await asyncio.shield(self._loading)
+
+    async def load_data(self) -> dict:
+        return copy.deepcopy(await self._ensure_loaded())
+
+    # ---------- escritura ----------
+    def _write(self, data: dict) -> object:
+        self.store.save_data(data)
+        return self.store.backend.stamp()
+
+    def _mark_dirty(self, eventos: List[dict]) -> asyncio.Task:
+        """Con el lock tomado: agenda (o reusa) la escritura que incluirá este cambio."""
+        self._gen += 1
+        self._dirty = True
+        self._eventos.extend(eventos)
+        if self._flush_task is None:
+            task = asyncio.get_running_loop().create_task(self._flush_soon(self.flush_delay))
+            # si nadie alcanza a esperarla, que el error no quede "never retrieved"
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._flush_task = task
+        return self._flush_task
+
+    async def _flush_soon(self, delay: float) -> None:
+        escribiendo = False
+        try:
+            await asyncio.sleep(delay)
+            async with self._lock:
+                # desde acá las mutaciones nuevas agendan otra escritura
+                self._flush_task = None
+                if not self._dirty:
+                    return
+                eventos, self._eventos = self._eventos, []
+                escribiendo = True
+                try:
+                    self._stamp = await asyncio.to_thread(self._write, self._data)
+                except Exception:
+                    # nunca llegó al disco: se descarta lo de memoria y se relee
+                    self._data, self._stamp, self._dirty = None, None, False
+                    raise
+                self._dirty = False
+                self.store._emitir(eventos)
+        except asyncio.CancelledError:
+            # el loop se está cerrando antes de escribir: se escribe igual, sin él
+            # (si ya se estaba escribiendo, ese hilo termina solo)
+            if self._dirty and not escribiendo:
+                self._flush_task = None
+                self._stamp = self._write(self._data)
+                self._dirty = False
+                eventos, self._eventos = self._eventos, []
+                self.store._emitir(eventos)
+            raise
+
+    async def flush(self) -> None:
+        """Espera la escritura en curso (re-lanza si falla). Las mutaciones ya esperan la suya."""
+        while self._flush_task is not None:
+            await asyncio.shield(self._flush_task)
+
+    def _check_reentrada(self) -> None:
+        if self in _en_transaccion.get():
+            raise RuntimeError("Dentro de transaction() usa los métodos de la transacción, no los del AsyncStore.")
+
+    async def _mutate(self, op, *args, **kwargs):
+        self._check_reentrada()
+        async with self._lock:
+            data = await self._ensure_loaded()
+            with self.store._retener() as eventos:
+                res = op(data, *args, **kwargs)
+            ok = res[0] if isinstance(res, tuple) else res
+            if not ok:
+                return res
+            escritura = self._mark_dirty(eventos)
+        # fuera del lock, para que otras mutaciones se sumen a la misma escritura
+        await asyncio.shield(escritura)
+        return res
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Bloque atómico: se trabaja sobre una copia, que reemplaza a data al salir
+        bien (y se espera su escritura); si hay error se descarta. Los eventos
+        salen recién después de escribir: lectores e índices ven sólo lo confirmado.
+        """
+        self._check_reentrada()
+        async with self._lock:
+            actual = await self._ensure_loaded()
+            tx = Transaccion(self.store, copy.deepcopy(actual))
+            token = _en_transaccion.set(_en_transaccion.get() + (self,))
+            try:
+                yield tx
+            finally:
+                _en_transaccion.reset(token)
+            self._data = tx.data
+            escritura = self._mark_dirty(tx.eventos)
+        await asyncio.shield(escritura)
+
+    # ---------- Perfil / Nivel ----------
+    async def get_nivel(self) -> str:
+        data = await self._ensure_loaded()
+        return data.get("perfil", {}).get("nivel", storage.NIVEL_DEFAULT)
+
+    async def set_nivel(self, nivel: str) -> None:
+        await self._mutate(self.store._set_nivel, nivel)
+
+    async def ponderacion_habilitada(self) -> bool:
+        return await self.get_nivel() in ("Universidad", "Postgrado")
+
+    # ---------- Ramos CRUD ----------
+    async def get_ramos(self) -> List[str]:
+        data = await self._ensure_loaded()
+        return list(data.get("ramos", {}).keys())
+
+    async def get_ramo_activo(self) -> str:
+        data = await self._ensure_loaded()
+        return data.get("ramo_activo", "Matemática")
+
+    async def set_ramo_activo(self, ramo: str) -> None:
+        await self._mutate(self.store._set_ramo_activo, ramo)
+
+    async def add_ramo(self, nombre: str) -> Tuple[bool, str]:
+        return await self._mutate(self.store._add_ramo, nombre)
+
+    async def rename_ramo(self, old: str, new: str) -> Tuple[bool, str]:
+        return await self._mutate(self.store._rename_ramo, old, new)
+
+    async def delete_ramo(self, ramo: str) -> Tuple[bool, str]:
+        return await self._mutate(self.store._delete_ramo, ramo)
+
+    # ---------- Evaluaciones ----------
+    async def get_evaluaciones(self, ramo: Optional[str] = None) -> List[Dict]:
+        data = await self._ensure_loaded()
+        return [dict(ev) for ev in self.store._get_evaluaciones(data, ramo)]
+
+    async def add_evaluacion(self, nota: float, peso: Optional[float] = None, ramo: Optional[str] = None,
+                             fecha=None, etiqueta: Optional[str] = None) -> Tuple[bool, str]:
+        return await self._mutate(self.store._add_evaluacion, nota, peso=peso, ramo=ramo, fecha=fecha, etiqueta=etiqueta)
+
+    async def add_evaluaciones(self, notas: List[float], peso: Optional[float] = None, ramo: Optional[str] = None,
+                               fecha=None, etiqueta: Optional[str] = None) -> Tuple[bool, str]:
+        return await self._mutate(self.store._add_evaluaciones, notas, peso=peso, ramo=ramo, fecha=fecha, etiqueta=etiqueta)
+
+    async def delete_evaluacion(self, idx: int, ramo: Optional[str] = None) -> Tuple[bool, str]:
+        return await self._mutate(self.store._delete_evaluacion, idx, ramo)
+
+    async def clear_evaluaciones(self, ramo: Optional[str] = None) -> None:
+        await self._mutate(self.store._clear_evaluaciones, ramo)
+
+    # ---------- Promedios ----------
+    async def promedio_ramo(self, ramo: Optional[str] = None) -> Tuple[Optional[float], str]:
+        data = await self._ensure_loaded()
+        return storage.promedio_ponderado(self.store._get_evaluaciones(data, ramo))
+
+    async def promedio_global(self) -> Tuple[Optional[float], str]:
+        return self.store._promedio_global(await self._ensure_loaded())
+
+# =========================
+# Atajos sobre el store por defecto
+# Para otros stores (ej: uno por usuario en un servidor) cada quien crea y
+# guarda su propio AsyncStore; acá no se cachean, para no retenerlos.
+# =========================
+_default: Optional[AsyncStore] = None
+_default_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def get_store() -> AsyncStore:
+    """AsyncStore del store por defecto para el loop actual (uno solo a la vez)."""
+    global _default, _default_loop
+    loop = asyncio.get_running_loop()
+    if _default is None or _default.store is not storage.default_store() or _default_loop is not loop:
+        if _default is not None and (_default._dirty or _default._flush_task is not None):
+            # no se bota en silencio lo que el anterior todavía no escribe
+            raise RuntimeError("El AsyncStore por defecto tiene cambios sin guardar en otro event loop; "
+                               "espera flush() allá antes de cambiar de loop o de store.")
+        _default = AsyncStore(storage.default_store())
+        _default_loop = loop
+    return _default
+
+async def load_data() -> dict:
+    return await get_store().load_data()
+
+async def flush() -> None:
+    await get_store().flush()
+
+def transaction():
+    return get_store().transaction()
+
+async def get_nivel() -> str:
+    return await get_store().get_nivel()
+
+async def set_nivel(nivel: str) -> None:
+    await get_store().set_nivel(nivel)
+
+async def ponderacion_habilitada() -> bool:
+    return await get_store().ponderacion_habilitada()
+
+async def get_ramos() -> List[str]:
+    return await get_store().get_ramos()
+
+async def get_ramo_activo() -> str:
+    return await get_store().get_ramo_activo()
+
+async def set_ramo_activo(ramo: str) -> None:
+    await get_store().set_ramo_activo(ramo)
+
+async def add_ramo(nombre: str) -> Tuple[bool, str]:
+    return await get_store().add_ramo(nombre)
+
+async def rename_ramo(old: str, new: str) -> Tuple[bool, str]:
+    return await get_store().rename_ramo(old, new)
+
+async def delete_ramo(ramo: str) -> Tuple[bool, str]:
+    return await get_store().delete_ramo(ramo)
+
+async def get_evaluaciones(ramo: Optional[str] = None) -> List[Dict]:
+    return await get_store().get_evaluaciones(ramo)
+
+async def add_evaluacion(nota: float, peso: Optional[float] = None, ramo: Optional[str] = None,
+                         fecha=None, etiqueta: Optional[str] = None) -> Tuple[bool, str]:
+    return await get_store().add_evaluacion(nota, peso=peso, ramo=ramo, fecha=fecha, etiqueta=etiqueta)
+
+async def add_evaluaciones(notas: List[float], peso: Optional[float] = None, ramo: Optional[str] = None,
+                           fecha=None, etiqueta: Optional[str] = None) -> Tuple[bool, str]:
+    return await get_store().add_evaluaciones(notas, peso=peso, ramo=ramo, fecha=fecha, etiqueta=etiqueta)
+
+async def delete_evaluacion(idx: int, ramo: Optional[str] = None) -> Tuple[bool, str]:
+    return await get_store().delete_evaluacion(idx, ramo)
+
+async def clear_evaluaciones(ramo: Optional[str] = None) -> None:
+    await get_store().clear_evaluaciones(ramo)
+
+async def promedio_ramo(ramo: Optional[str] = None) -> Tuple[Optional[float], str]:
+    return await get_store().promedio_ramo(ramo)
+
+async def promedio_global() -> Tuple[Optional[float], str]:
+    return await get_store().promedio_global()
@@ -0,0 +1,320 @@
+import hashlib
+import json
+import uuid
+import weakref
+from collections import Counter
+from pathlib import Path
+from typing import Optional, Tuple, List, Dict
+
+import storage
+
+# =========================
+# Sync por diferencias entre el build de PC y el APK
+# Se intercambian archivos chicos en vez de copiar data.json entero:
+#   1) A: exportar_manifiesto("a.manifest.json")           hash por ramo
+#   2) B: exportar_cambios("a.manifest.json", "b.cambios.json")
+#         sólo los ramos cuyo hash difiere del de A
+#   3) A: importar_cambios("b.cambios.json", respuesta="a.cambios.json")
+#         fusiona y deja en la respuesta lo que B todavía no tiene
+#   4) B: importar_cambios("a.cambios.json")
+# Cada store recuerda, por peer, el último estado común de cada ramo como
+# lista de claves de evaluaciones (data["sync"][id_local][id_peer]); con eso
+# las ediciones concurrentes se fusionan en 3 vías de forma determinista.
+# Junto a esa base se guarda la "rev" local del ramo y su hash: mientras la
+# rev no cambie, el ramo no se vuelve a hashear (el costo va con lo editado).
+# El id del dispositivo NO va en data.json (se copia entre builds): vive en
+# un archivo al lado, "data.json.device".
+# =========================
+FORMATO = "n-notas-sync/1"
+_ids_memoria: "weakref.WeakKeyDictionary[storage.Store, str]" = weakref.WeakKeyDictionary()
+
+def _nuevo_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+def _id_path(store: storage.Store) -> Optional[Path]:
+    path = getattr(store.backend, "path", None)
+    return Path(path).with_name(Path(path).name + ".device") if path is not None else None
+
+def device_id(store: storage.Store, renovar: bool = False) -> str:
+    """Id de este dispositivo para el store (se crea la primera vez)."""
+    side = _id_path(store)
+    if side is None:
+        if renovar or store not in _ids_memoria:
+            _ids_memoria[store] = _nuevo_id()
+        return _ids_memoria[store]
+
+    if not renovar:
+        try:
+            t = side.read_text(encoding="utf-8").strip()
+            if t:
+                return t
+        except OSError:
+            pass
+    nuevo = _nuevo_id()
+    side.parent.mkdir(parents=True, exist_ok=True)
+    side.write_text(nuevo, encoding="utf-8")
+    return nuevo
+
+def ev_key(ev: dict) -> str:
+    txt = json.dumps(ev, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(txt.encode("utf-8")).hexdigest()[:16]
+
+def _hash_keys(keys: List[str]) -> str:
+    return hashlib.sha1("\n".join(keys).encode("ascii")).hexdigest()
+
+def ramo_hash(evs: List[Dict]) -> str:
+    return _hash_keys([ev_key(ev) for ev in evs])
+
+def _peer(data: dict, local_id: str, peer_id: str) -> dict:
+    p = data.setdefault("sync", {}).setdefault(local_id, {}).setdefault(peer_id, {})
+    p.setdefault("base", {})     # ramo -> claves del último estado común
+    p.setdefault("enviado", {})  # ramo -> claves de lo último que le mandamos
+    p.setdefault("revs", {})     # ramo -> {"rev", "hash"} locales de esa base
+    return p
+
+def _rev(obj: dict) -> int:
+    return int(obj.get("rev", 0))
+
+def _fijar_base(peer: dict, ramo: str, keys: List[str], h: str, rev: int) -> None:
+    peer["base"][ramo] = keys
+    peer["revs"][ramo] = {"rev": rev, "hash": h}
+
+def _estado_local(data: dict, peer: dict, ramo: str) -> Tuple[List[str], str]:
+    """(claves, hash) del ramo; sin hashear si no cambió desde la base con este peer."""
+    obj = data["ramos"][ramo]
+    reg = peer["revs"].get(ramo)
+    if reg is not None and reg["rev"] == _rev(obj) and ramo in peer["base"]:
+        return peer["base"][ramo], reg["hash"]
+    keys = [ev_key(ev) for ev in obj.get("evaluaciones", [])]
+    return keys, _hash_keys(keys)
+
+def _hash_local(data: dict, local_id: str, ramo: str) -> str:
+    # cualquier peer que tenga registrada la rev actual ya sabe el hash
+    rev = _rev(data["ramos"][ramo])
+    for p in data.get("sync", {}).get(local_id, {}).values():
+        reg = p.get("revs", {}).get(ramo)
+        if reg is not None and reg["rev"] == rev:
+            return reg["hash"]
+    return ramo_hash(data["ramos"][ramo].get("evaluaciones", []))
+
+def _manifiesto(data: dict, local_id: str) -> dict:
+    return {
+        "formato": FORMATO,
+        "tipo": "manifiesto",
+        "id": local_id,
+        "ramos": {r: {"hash": _hash_local(data, local_id, r)} for r in data["ramos"]},
+    }
+
+def _cambios(data: dict, local_id: str, manifiesto_peer: dict,
+             base_hashes: Optional[Dict[str, str]] = None) -> dict:
+    peer = _peer(data, local_id, manifiesto_peer["id"])
+    remotos = manifiesto_peer.get("ramos", {})
+    ramos = {}
+    for r, obj in data["ramos"].items():
+        keys, h = _estado_local(data, peer, r)
+        if remotos.get(r, {}).get("hash") == h:
+            _fijar_base(peer, r, keys, h, _rev(obj))  # ya son iguales: es estado común
+            continue
+        if base_hashes and r in base_hashes:
+            bh = base_hashes[r]
+        else:
+            bh = _hash_keys(peer["base"][r]) if r in peer["base"] else None
+        ramos[r] = {"evaluaciones": obj.get("evaluaciones", []), "hash": h, "base_hash": bh}
+        peer["enviado"][r] = keys
+
+    # borrados acá desde el último estado común, que el otro todavía tiene
+    eliminados = [r for r in peer["base"] if r not in data["ramos"] and r in remotos]
+    return {
+        "formato": FORMATO,
+        "tipo": "cambios",
+        "manifiesto": _manifiesto(data, local_id),
+        "para": manifiesto_peer["id"],
+        "ramos": ramos,
+        "eliminados": eliminados,
+    }
+
+def _fusionar(local: List[Dict], remoto: List[Dict], base_keys: Optional[List[str]]) -> List[Dict]:
+    """
+    3 vías sobre multiconjuntos: cada evaluación queda max(0, local + remoto - base) veces.
+    Sin historia común se toma como base lo que ambos tienen (no duplica una copia
+    inicial de data.json). Orden: las de local en su orden, luego las nuevas del remoto.
+    """
+    lk = [ev_key(ev) for ev in local]
+    rk = [ev_key(ev) for ev in remoto]
+    cl, cr = Counter(lk), Counter(rk)
+    base = cl & cr if base_keys is None else Counter(base_keys)
+    quedan = Counter({k: max(0, cl[k] + cr[k] - base[k]) for k in cl.keys() | cr.keys()})
+
+    out = []
+    for k, ev in list(zip(lk, local)) + list(zip(rk, remoto)):
+        if quedan[k] > 0:
+            quedan[k] -= 1
+            out.append(ev)
+    return out
+
+def _aplicar(data: dict, local_id: str, cambios: dict) -> dict:
+    manif = cambios["manifiesto"]
+    peer = _peer(data, local_id, manif["id"])
+    resumen = {"nuevos": [], "actualizados": [], "fusionados": [], "eliminados": []}
+
+    for r, ent in cambios.get("ramos", {}).items():
+        remoto = [x for x in map(storage._clean_ev_v13, ent.get("evaluaciones", [])) if x is not None]
+        rk = [ev_key(ev) for ev in remoto]
+        rh = _hash_keys(rk)
+        bh = ent.get("base_hash")
+
+        # la base que usó el otro: debe ser una que conozcamos
+        base_keys = None
+        for cand in (peer["base"].get(r), peer["enviado"].get(r)):
+            if cand is not None and bh is not None and _hash_keys(cand) == bh:
+                base_keys = cand
+                break
+
+        obj = data["ramos"].get(r)
+        if obj is None:
+            if base_keys is not None and r in peer["base"] and rh == bh:
+                # lo borramos acá y allá no cambió: sigue borrado
+                continue
+            obj = data["ramos"][r] = {"evaluaciones": remoto}
+            resumen["nuevos"].append(r)
+            keys, h = rk, rh
+        else:
+            local = obj.get("evaluaciones", [])
+            keys, h = _estado_local(data, peer, r)
+            if h == rh or (base_keys is not None and rh == bh):
+                pass  # iguales, o el otro no cambió
+            else:
+                if base_keys is not None and h == bh:
+                    merged, keys, h = remoto, rk, rh  # sólo cambió el otro
+                    resumen["actualizados"].append(r)
+                else:
+                    merged = _fusionar(local, remoto, base_keys)
+                    keys = [ev_key(ev) for ev in merged]
+                    h = _hash_keys(keys)
+                    resumen["fusionados"].append(r)
+                obj["evaluaciones"] = merged
+                obj["rev"] = _rev(obj) + 1
+        _fijar_base(peer, r, keys, h, _rev(obj))
+
+    for r in cambios.get("eliminados", []):
+        obj = data["ramos"].get(r)
+        # sin cambios desde lo último que ambos tenían (o que le mandamos)
+        conocidos = [k for k in (peer["base"].get(r), peer["enviado"].get(r)) if k is not None]
+        sin_cambios = (obj is not None
+                       and _estado_local(data, peer, r)[1] in {_hash_keys(k) for k in conocidos})
+        # si acá se editó, gana la edición
+        if sin_cambios and len(data["ramos"]) > 1:
+            del data["ramos"][r]
+            if data.get("ramo_activo") == r:
+                data["ramo_activo"] = list(data["ramos"].keys())[0]
+            resumen["eliminados"].append(r)
+        peer["base"].pop(r, None)
+        peer["enviado"].pop(r, None)
+        peer["revs"].pop(r, None)
+
+    # ramos que el manifiesto muestra iguales también son estado común
+    for r, info in manif.get("ramos", {}).items():
+        if r in data["ramos"] and r not in cambios.get("ramos", {}):
+            keys, h = _estado_local(data, peer, r)
+            if h == info.get("hash"):
+                _fijar_base(peer, r, keys, h, _rev(data["ramos"][r]))
+
+    return resumen
+
+# =========================
+# Transporte por archivos
+# =========================
+def _es_str(x) -> bool:
+    return isinstance(x, str) and bool(x)
+
+def _manifiesto_valido(m) -> bool:
+    if not isinstance(m, dict) or m.get("formato") != FORMATO or m.get("tipo") != "manifiesto":
+        return False
+    if not _es_str(m.get("id")) or not isinstance(m.get("ramos"), dict):
+        return False
+    return all(
+        _es_str(r) and isinstance(info, dict) and _es_str(info.get("hash"))
+        for r, info in m["ramos"].items()
+    )
+
+def _cambios_validos(c) -> bool:
+    if not _manifiesto_valido(c.get("manifiesto")) or not _es_str(c.get("para")):
+        return False
+    if not isinstance(c.get("ramos"), dict) or not isinstance(c.get("eliminados", []), list):
+        return False
+    if not all(_es_str(r) for r in c.get("eliminados", [])):
+        return False
+    for r, ent in c["ramos"].items():
+        if not (_es_str(r) and isinstance(ent, dict) and isinstance(ent.get("evaluaciones"), list)
+                and _es_str(ent.get("hash"))
+                and (ent.get("base_hash") is None or _es_str(ent.get("base_hash")))):
+            return False
+    return True
+
+def _leer(path: Path, tipo: str) -> dict:
+    obj = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(obj, dict) or obj.get("formato") != FORMATO or obj.get("tipo") != tipo:
+        raise ValueError(f"{path} no es un archivo de sync válido ({tipo}).")
+    ok = _manifiesto_valido(obj) if tipo == "manifiesto" else _cambios_validos(obj)
+    if not ok:
+        raise ValueError(f"{path} tiene un formato dañado ({tipo}).")
+    return obj
+
+def manifiesto(store: Optional[storage.Store] = None) -> dict:
+    store = store or storage.default_store()
+    return _manifiesto(store.load_data(), device_id(store))
+
+def exportar_manifiesto(destino: Path, store: Optional[storage.Store] = None) -> Path:
+    destino = Path(destino)
+    storage._safe_write(manifiesto(store), destino)
+    return destino
+
+def exportar_cambios(manifiesto_peer: Path, destino: Path, store: Optional[storage.Store] = None) -> Tuple[bool, str]:
+    """Escribe los ramos que el otro no tiene igual (según su manifiesto)."""
+    store = store or storage.default_store()
+    try:
+        m = _leer(manifiesto_peer, "manifiesto")
+    except (OSError, ValueError) as e:
+        return False, f"Manifiesto inválido: {e}"
+    local_id = device_id(store)
+    if m["id"] == local_id:
+        # el otro lado tiene nuestro mismo id (se copió el .device): éste cambia
+        local_id = device_id(store, renovar=True)
+    data = store.load_data()
+    cambios = _cambios(data, local_id, m)
+    store.save_data(data)  # guarda base/enviado
+    storage._safe_write(cambios, Path(destino))
+    return True, f"{len(cambios['ramos'])} ramo(s) exportado(s)."
+
+def importar_cambios(origen: Path, respuesta: Optional[Path] = None,
+                     store: Optional[storage.Store] = None) -> Tuple[bool, str, dict]:
+    """
+    Fusiona un archivo de cambios. Con `respuesta` escribe además los cambios
+    de vuelta para el otro lado (lo que acá había y allá no).
+    """
+    store = store or storage.default_store()
+    try:
+        cambios = _leer(origen, "cambios")
+    except (OSError, ValueError) as e:
+        return False, f"Archivo de cambios inválido: {e}", {}
+    local_id = device_id(store)
+    if cambios["para"] != local_id:
+        return False, "Ese archivo de cambios es para otro dispositivo.", {}
+    if cambios["manifiesto"]["id"] == local_id:
+        return False, "El archivo viene de este mismo dispositivo.", {}
+
+    data = store.load_data()
+    resumen = _aplicar(data, local_id, cambios)
+    vuelta = None
+    if respuesta is not None:
+        # el otro fusionará contra lo que nos mandó
+        bases = {r: ent.get("hash") for r, ent in cambios.get("ramos", {}).items()}
+        vuelta = _cambios(data, local_id, cambios["manifiesto"], base_hashes=bases)
+
+    store.save_data(data)
+    store._emit({"tipo": "reset", "data": data})
+    if vuelta is not None:
+        storage._safe_write(vuelta, Path(respuesta))
+
+    n = sum(len(v) for v in resumen.values())
+    return True, f"Sync listo: {n} ramo(s) con cambios.", resumen
@@ -0,0 +1,59 @@
+import pytest
+
+import conversion
+import storage
+
+
+def test_formula_y_redondeo():
+    assert conversion.nota_desde_puntaje(30, 50) == 4.0
+    assert conversion.nota_desde_puntaje(0, 50) == 1.0
+    assert conversion.nota_desde_puntaje(50, 50) == 7.0
+    assert conversion.nota_desde_puntaje(7.5, 10) == 5.1  # 5.125
+    assert conversion.nota_desde_puntaje(51, 50) is None
+    with pytest.raises(ValueError):
+        conversion.nota_desde_puntaje(5, 10, exigencia=1.0)
+
+
+def test_tabla_se_reutiliza_y_coincide_con_la_formula():
+    conversion.tabla_conversion.cache_clear()
+    puntajes = [x / 2 for x in range(0, 81)]
+    notas = conversion.convertir_lote(puntajes, 40, paso=0.5)
+    conversion.convertir_lote([10, 20], 40, paso=0.5)
+    assert conversion.tabla_conversion.cache_info().misses == 1
+    assert notas == [conversion.nota_desde_puntaje(p, 40) for p in puntajes]
+    # fuera de la grilla se calcula directo; inválidos quedan en None
+    assert conversion.convertir_lote([17.25, -1, "x"], 40, paso=0.5) == [
+        conversion.nota_desde_puntaje(17.25, 40), None, None]
+
+
+def test_agregar_puntajes_con_peso_fecha_y_etiqueta():
+    s = storage.Store.in_memory()
+    s.set_nivel("Universidad")
+    ok, _ = conversion.agregar_puntajes([30, 50], 50, ramo="Historia", peso=25.0,
+                                        fecha="2026-05-04T09:00:00", etiqueta="Prueba 1", store=s)
+    assert ok
+    assert s.get_evaluaciones("Historia") == [
+        {"nota": 4.0, "peso": 25.0, "fecha": "2026-05-04T09:00:00", "etiqueta": "Prueba 1"},
+        {"nota": 7.0, "peso": 25.0, "fecha": "2026-05-04T09:00:00", "etiqueta": "Prueba 1"},
+    ]
+    assert conversion.agregar_puntajes([10, 60], 50, store=s) == (False, "Puntaje fuera de rango.")
+
+
+def test_grilla_muy_fina_no_arma_tabla():
+    conversion.tabla_conversion.cache_clear()
+    with pytest.raises(ValueError):
+        conversion.tabla_conversion(1000, paso=0.01)
+    puntajes = [0, 333.33, 600, 999.99]
+    assert conversion.convertir_lote(puntajes, 1000, paso=0.01) == [
+        conversion.nota_desde_puntaje(p, 1000) for p in puntajes]
+    assert conversion.tabla_conversion.cache_info().currsize == 0
+
+
+@pytest.mark.parametrize("paso", [0.5, 0.01])
+def test_ruta_numpy_coincide_con_la_de_listas(paso):
+    np = pytest.importorskip("numpy")
+    puntajes = [x / 4 for x in range(-4, 4 * 60 + 5)]  # en grilla, fuera de grilla e inválidos
+    lista = conversion.convertir_lote(puntajes, 60, paso=paso)
+    arr = conversion.convertir_lote(np.array(puntajes), 60, paso=paso)
+    assert isinstance(arr, np.ndarray)
+    assert [None if np.isnan(x) else float(x) for x in arr] == lista
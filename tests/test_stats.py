@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+import stats
+import storage
+
+
+def _igual_a_reconstruido(indice, store):
+    ref = stats.GradeIndex.from_data(store.load_data())
+    for r in store.get_ramos():
+        assert indice.notas(r) == ref.notas(r)
+        assert indice.histograma(r) == ref.histograma(r)
+    assert indice.notas() == ref.notas()
+    assert indice.histograma() == ref.histograma()
+
+
+def test_indice_sigue_add_delete_clear_rename():
+    rnd = random.Random(7)
+    s = storage.Store.in_memory()
+    indice = stats.GradeIndex.attach(s)
+    for _ in range(40):
+        s.add_evaluacion(round(rnd.uniform(1, 7), 1), ramo=rnd.choice(storage.RAMOS_DEFAULT))
+    s.delete_evaluacion(0, ramo="Historia")
+    s.clear_evaluaciones("Ciencias")
+    s.add_ramo("Arte")
+    s.add_evaluacion(3.5, ramo="Arte")
+    s.rename_ramo("Arte", "Música")
+    _igual_a_reconstruido(indice, s)
+
+
+def test_estadisticas_de_orden_y_rangos():
+    s = storage.Store.in_memory()
+    indice = stats.GradeIndex.attach(s)
+    s.add_evaluaciones([2.0, 4.0, 6.0, 7.0], ramo="Historia")
+    s.add_evaluacion(3.9, ramo="Inglés")
+
+    assert indice.mediana("Historia") == 5.0
+    assert indice.percentil(25, "Historia") == 3.5
+    assert (indice.minimo(), indice.maximo()) == (2.0, 7.0)
+    assert indice.bajo() == [("Historia", 2.0), ("Inglés", 3.9)]
+    assert indice.contar_rango(4.0, 7.0) == 2  # [4, 7)
+    assert dict(indice.histograma("Historia"))["6–7"] == 2
+
+
+def test_escritura_fallida_no_llega_al_indice():
+    s = storage.Store.in_memory()
+    indice = stats.GradeIndex.attach(s)
+    s.add_evaluacion(5.0, ramo="Historia")
+
+    def write_que_falla(data):
+        raise OSError("disco lleno")
+
+    s.backend.write = write_que_falla
+    with pytest.raises(OSError):
+        s.add_evaluacion(6.0, ramo="Historia")
+    assert indice.notas("Historia") == [5.0]
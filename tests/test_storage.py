@@ -0,0 +1,22 @@
+import storage
+
+
+def test_migra_v12_a_v13_conservando_notas():
+    s = storage.Store.in_memory({
+        "version": "1.2",
+        "perfil": {"nombre": "P", "nivel": "Escolar"},
+        "ramos": {"Historia": {"evaluaciones": [{"nota": 5}, {"nota": 9}]}},
+        "ramo_activo": "Historia",
+    })
+    data = s.load_data()
+    assert data["version"] == "1.3"
+    assert data["ramos"]["Historia"]["evaluaciones"] == [{"nota": 5.0}]
+
+
+def test_fecha_y_etiqueta():
+    s = storage.Store.in_memory()
+    assert s.add_evaluacion(5.0, fecha="2026-03-01T10:00:00", etiqueta="  Prueba 1 ") == (True, "OK")
+    assert s.get_evaluaciones()[-1] == {"nota": 5.0, "fecha": "2026-03-01T10:00:00", "etiqueta": "Prueba 1"}
+    assert s.add_evaluacion(5.0, fecha="ayer")[0] is False
+    assert s.add_evaluacion(5.0, etiqueta=5) == (False, "Etiqueta inválida.")
+    assert len(s.get_evaluaciones()) == 1
@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+
+import stats
+import storage
+import storage_async
+
+
+class ContarStore(storage.Store):
+    """Store en memoria que cuenta lecturas y escrituras del backend."""
+
+    def __init__(self):
+        super().__init__(backend=storage.MemoryBackend())
+        self.lecturas = 0
+        self.escrituras = 0
+
+    def load_data(self):
+        self.lecturas += 1
+        return super().load_data()
+
+    def save_data(self, data):
+        self.escrituras += 1
+        super().save_data(data)
+
+
+def test_lectores_comparten_carga_y_escrituras_se_juntan():
+    store = ContarStore()
+
+    async def main():
+        a = storage_async.AsyncStore(store)
+        await asyncio.gather(*[a.promedio_global() for _ in range(50)])
+        assert store.lecturas == 1
+        await asyncio.gather(*[a.add_evaluacion(5.0) for _ in range(100)])
+        await a.flush()
+        assert store.escrituras == 1
+        assert len(await a.get_evaluaciones()) == 100
+
+    asyncio.run(main())
+    assert len(store.get_evaluaciones()) == 100
+
+
+def test_transaction_no_bloquea_y_revierte():
+    store = storage.Store.in_memory()
+    indice = stats.GradeIndex.attach(store)
+
+    async def main():
+        a = storage_async.AsyncStore(store)
+        async with a.transaction() as tx:
+            tx.add_evaluacion(6.0, ramo="Historia")
+            # reentrar al AsyncStore falla en vez de quedarse esperando el lock
+            with pytest.raises(RuntimeError):
+                await asyncio.wait_for(a.add_evaluacion(5.0), 0.5)
+
+        with pytest.raises(ValueError):
+            async with a.transaction() as tx:
+                tx.add_evaluacion(2.0, ramo="Historia")
+                # los lectores no ven lo que no se ha confirmado
+                assert [e["nota"] for e in await a.get_evaluaciones("Historia")] == [6.0]
+                raise ValueError
+        await a.flush()
+        return await a.get_evaluaciones("Historia")
+
+    evs = asyncio.run(main())
+    assert [e["nota"] for e in evs] == [6.0]
+    assert indice.notas("Historia") == [6.0]
+    assert [e["nota"] for e in store.get_evaluaciones("Historia")] == [6.0]
+
+
+def test_mutacion_esta_en_disco_al_volver(tmp_path):
+    store = storage.Store(tmp_path / "data.json")
+    assert asyncio.run(storage_async.AsyncStore(store).add_evaluacion(5.5, ramo="Historia")) == (True, "OK")
+    assert [e["nota"] for e in storage.Store(tmp_path / "data.json").get_evaluaciones("Historia")] == [5.5]
+
+
+def test_cierre_del_loop_no_pierde_la_escritura_pendiente():
+    store = storage.Store.in_memory()
+
+    async def main():
+        a = storage_async.AsyncStore(store, flush_delay=60.0)
+        asyncio.get_running_loop().create_task(a.add_evaluacion(4.0, ramo="Historia"))
+        await asyncio.sleep(0.05)  # la mutación ya está en memoria, la escritura esperando
+
+    asyncio.run(main())
+    assert [e["nota"] for e in store.get_evaluaciones("Historia")] == [4.0]
+
+
+def test_transaction_emite_eventos_solo_al_confirmar():
+    store = storage.Store.in_memory()
+    eventos = []
+    store.subscribe(eventos.append)
+
+    async def main():
+        a = storage_async.AsyncStore(store)
+        async with a.transaction() as tx:
+            tx.add_evaluacion(6.0, ramo="Historia")
+            tx.add_ramo("Arte")
+            assert eventos == []
+        assert [e["tipo"] for e in eventos] == ["add_evaluacion", "add_ramo"]
+
+    asyncio.run(main())
+
+
+def test_escritura_fallida_llega_a_quien_muto():
+    store = storage.Store.in_memory()
+    indice = stats.GradeIndex.attach(store)
+    fallas = [OSError("disco lleno")]
+    write = store.backend.write
+
+    def write_que_falla(data):
+        if fallas:
+            raise fallas.pop()
+        write(data)
+
+    async def main():
+        a = storage_async.AsyncStore(store)
+        await a.get_ramos()
+        store.backend.write = write_que_falla
+        with pytest.raises(OSError):
+            await a.add_evaluacion(4.5)
+        # lo que no se escribió no queda ni en memoria ni en los índices
+        assert await a.get_evaluaciones() == []
+        assert indice.count() == 0
+        assert await a.add_evaluacion(5.0) == (True, "OK")
+
+    asyncio.run(main())
+    assert [e["nota"] for e in store.get_evaluaciones()] == [5.0]
+    assert indice.notas() == [5.0]
+
+
+def test_get_store_no_bota_cambios_de_otro_loop(monkeypatch):
+    store = storage.Store.in_memory()
+    monkeypatch.setattr(storage, "_default_store", store)
+    monkeypatch.setattr(storage_async, "_default", None)
+
+    async def primero():
+        storage_async.get_store()._dirty = True  # como si quedara una escritura pendiente
+
+    async def segundo():
+        storage_async.get_store()
+
+    asyncio.run(primero())
+    with pytest.raises(RuntimeError):
+        asyncio.run(segundo())
@@ -0,0 +1,158 @@
+import json
+import shutil
+
+import storage
+import sync
+
+
+def _store(tmp_path, nombre):
+    return storage.Store(tmp_path / nombre / "data.json")
+
+
+def _copiar(tmp_path, origen, destino):
+    (tmp_path / destino).mkdir()
+    shutil.copy(tmp_path / origen / "data.json", tmp_path / destino / "data.json")
+    return _store(tmp_path, destino)
+
+
+def _ronda(tmp_path, a, b):
+    """Ida y vuelta completa: manifiesto de A, cambios de B, respuesta de A."""
+    sync.exportar_manifiesto(tmp_path / "a.manifest", a)
+    ok, msg = sync.exportar_cambios(tmp_path / "a.manifest", tmp_path / "b.cambios", b)
+    assert ok, msg
+    ok, msg, res_a = sync.importar_cambios(tmp_path / "b.cambios", tmp_path / "a.cambios", a)
+    assert ok, msg
+    ok, msg, res_b = sync.importar_cambios(tmp_path / "a.cambios", None, b)
+    assert ok, msg
+    return res_a, res_b
+
+
+def _notas(store, ramo):
+    return [ev["nota"] for ev in store.get_evaluaciones(ramo)]
+
+
+def _iguales(a, b):
+    return sync.manifiesto(a)["ramos"] == sync.manifiesto(b)["ramos"]
+
+
+def _base(tmp_path):
+    a = _store(tmp_path, "a")
+    for i, n in enumerate([5.0, 6.0, 4.0]):
+        a.add_evaluacion(n, ramo="Historia", fecha=f"2026-01-0{i + 1}T10:00:00")
+    b = _copiar(tmp_path, "a", "b")
+    return a, b
+
+
+def test_primera_sync_tras_copiar_data_json_no_duplica(tmp_path):
+    a, b = _base(tmp_path)
+    res_a, res_b = _ronda(tmp_path, a, b)
+    assert _notas(a, "Historia") == [5.0, 6.0, 4.0]
+    assert _notas(b, "Historia") == [5.0, 6.0, 4.0]
+    assert not any(res_a.values()) and not any(res_b.values())
+    assert sync.device_id(a) != sync.device_id(b)
+
+
+def test_agregar_y_borrar_concurrentes(tmp_path):
+    a, b = _base(tmp_path)
+    _ronda(tmp_path, a, b)
+    a.add_evaluacion(7.0, ramo="Historia", fecha="2026-03-01T10:00:00")
+    b.delete_evaluacion(0, ramo="Historia")
+    b.add_evaluacion(2.0, ramo="Ciencias", fecha="2026-03-02T10:00:00")
+
+    res_a, _ = _ronda(tmp_path, a, b)
+    assert res_a["fusionados"] == ["Historia"]
+    assert _notas(a, "Historia") == [6.0, 4.0, 7.0]
+    assert _notas(a, "Ciencias") == [2.0]
+    assert _iguales(a, b)
+
+
+def test_ramo_borrado_contra_editado_gana_la_edicion(tmp_path):
+    a, b = _base(tmp_path)
+    a.add_ramo("Arte")
+    a.add_evaluacion(6.0, ramo="Arte", fecha="2026-02-01T10:00:00")
+    _ronda(tmp_path, a, b)
+    assert _notas(b, "Arte") == [6.0]
+
+    b.delete_ramo("Arte")
+    a.add_evaluacion(3.0, ramo="Arte", fecha="2026-02-02T10:00:00")
+    _ronda(tmp_path, a, b)
+    assert _notas(a, "Arte") == [6.0, 3.0]
+    assert _notas(b, "Arte") == [6.0, 3.0]
+
+
+def test_ramo_borrado_sin_edicion_se_borra_en_ambos(tmp_path):
+    a, b = _base(tmp_path)
+    a.add_ramo("Arte")
+    _ronda(tmp_path, a, b)
+    b.delete_ramo("Arte")
+    _ronda(tmp_path, a, b)
+    assert "Arte" not in a.get_ramos() and "Arte" not in b.get_ramos()
+
+
+def test_segunda_ronda_sin_cambios_no_manda_ramos(tmp_path):
+    a, b = _base(tmp_path)
+    a.add_evaluacion(7.0, ramo="Historia", fecha="2026-03-01T10:00:00")
+    _ronda(tmp_path, a, b)
+    res_a, res_b = _ronda(tmp_path, a, b)
+    assert not any(res_a.values()) and not any(res_b.values())
+    cambios = json.loads((tmp_path / "b.cambios").read_text(encoding="utf-8"))
+    assert cambios["ramos"] == {}
+    assert _iguales(a, b)
+
+
+def test_copia_despues_de_sincronizar_tiene_otro_id(tmp_path):
+    a, b = _base(tmp_path)
+    _ronda(tmp_path, a, b)
+    c = _copiar(tmp_path, "b", "c")
+    assert sync.device_id(c) not in (sync.device_id(a), sync.device_id(b))
+    a.add_evaluacion(1.5, ramo="Historia", fecha="2026-04-01T10:00:00")
+    _ronda(tmp_path, a, c)
+    assert _notas(c, "Historia") == [5.0, 6.0, 4.0, 1.5]
+
+
+def test_archivo_de_cambios_danado_devuelve_error(tmp_path):
+    a, _ = _base(tmp_path)
+    malo = {"formato": sync.FORMATO, "tipo": "cambios", "para": sync.device_id(a), "ramos": {}}
+    (tmp_path / "malo.cambios").write_text(json.dumps(malo), encoding="utf-8")
+    ok, msg, res = sync.importar_cambios(tmp_path / "malo.cambios", store=a)
+    assert not ok and res == {}
+
+
+def test_seccion_sync_danada_se_limpia_al_cargar():
+    s = storage.Store.in_memory()
+    data = s.load_data()
+    data["sync"] = {"x": {"y": {"base": {"Historia": "no-es-lista"}}, "z": 3}, "w": []}
+    s.save_data(data)
+    assert s.load_data()["sync"] == {"x": {"y": {"base": {}, "enviado": {}, "revs": {}}}}
+
+
+def test_ramos_sin_cambios_no_se_vuelven_a_hashear(tmp_path, monkeypatch):
+    a, b = _base(tmp_path)
+    for r in ("Lenguaje", "Ciencias"):
+        a.add_evaluaciones([5.0] * 20, ramo=r, fecha="2026-01-05T10:00:00")
+    _ronda(tmp_path, a, b)
+    _ronda(tmp_path, a, b)  # ahora ambos lados tienen registrada la rev de cada ramo
+
+    claves = []
+    ev_key = sync.ev_key
+    monkeypatch.setattr(sync, "ev_key", lambda ev: claves.append(ev) or ev_key(ev))
+    a.add_evaluacion(7.0, ramo="Historia", fecha="2026-03-01T10:00:00")
+    res_a, res_b = _ronda(tmp_path, a, b)
+    assert res_b["actualizados"] == ["Historia"]
+    assert claves and all(ev in a.get_evaluaciones("Historia") for ev in claves)
+    assert _iguales(a, b)
+
+
+def test_ramo_recreado_con_la_misma_rev_se_vuelve_a_hashear(tmp_path):
+    a, b = _base(tmp_path)
+    a.add_ramo("Arte")
+    a.add_evaluacion(6.0, ramo="Arte", fecha="2026-02-01T10:00:00")
+    _ronda(tmp_path, a, b)
+    _ronda(tmp_path, a, b)
+    # mismo nombre y misma rev, otro contenido
+    a.delete_ramo("Arte")
+    a.add_ramo("Arte")
+    a.add_evaluacion(2.0, ramo="Arte", fecha="2026-02-03T10:00:00")
+    _ronda(tmp_path, a, b)
+    assert _notas(b, "Arte") == _notas(a, "Arte")
+    assert 2.0 in _notas(b, "Arte")
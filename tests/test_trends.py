@@ -0,0 +1,86 @@
+import random
+from datetime import datetime
+
+import pytest
+
+import storage
+import trends
+
+
+def _pendiente(ys):
+    n = len(ys)
+    mx, my = (n - 1) / 2, sum(ys) / n
+    return sum((x - mx) * (y - my) for x, y in enumerate(ys)) / sum((x - mx) ** 2 for x in range(n))
+
+
+def test_promedio_movil_y_pendiente_contra_fuerza_bruta():
+    rnd = random.Random(3)
+    tr = trends.RamoTrend(ventana=5)
+    notas = []
+    for _ in range(60):
+        n = round(rnd.uniform(1, 7), 1)
+        tr.add(n)
+        notas.append(n)
+        ult = notas[-5:]
+        assert tr.promedio_movil() == pytest.approx(sum(ult) / len(ult))
+        if len(ult) >= 2:
+            assert tr.pendiente() == pytest.approx(_pendiente(ult))
+        else:
+            assert tr.pendiente() is None
+
+
+def test_promedio_dias_incluye_ambos_bordes():
+    ahora = 100 * trends.DIA
+    tr = trends.RamoTrend()
+    tr.add(2.0, ahora - 30 * trends.DIA - 1)  # justo afuera
+    tr.add(4.0, ahora - 30 * trends.DIA)      # borde de la ventana
+    tr.add(6.0, ahora)                        # ahora mismo
+    tr.add(7.0, ahora + 1)                    # en el futuro
+    tr.add(5.0)                               # sin fecha: no cuenta
+    assert tr.promedio_dias(30, ahora) == (5.0, 2)
+    assert tr.promedio_dias(1, ahora - 50 * trends.DIA) == (None, 0)
+
+
+def test_fechas_desordenadas():
+    rnd = random.Random(11)
+    tr = trends.RamoTrend()
+    evs = [(rnd.uniform(0, 60) * trends.DIA, round(rnd.uniform(1, 7), 1)) for _ in range(40)]
+    for ts, n in evs:
+        tr.add(n, ts)
+    for dias, ahora in [(7, 30 * trends.DIA), (15, 45 * trends.DIA), (60, 60 * trends.DIA)]:
+        dentro = [n for ts, n in evs if ahora - dias * trends.DIA <= ts <= ahora]
+        prom, n = tr.promedio_dias(dias, ahora)
+        assert n == len(dentro)
+        assert prom == pytest.approx(sum(dentro) / len(dentro))
+
+
+def _igual_a_reconstruido(indice, store):
+    ref = trends.TrendIndex.from_data(store.load_data())
+    ahora = datetime(2026, 3, 31).timestamp()
+    for r in store.get_ramos():
+        a, b = indice.ramo(r), ref.ramo(r)
+        assert a.count() == b.count()
+        assert a.promedio_movil() == pytest.approx(b.promedio_movil())
+        assert a.pendiente() == pytest.approx(b.pendiente())
+        assert a.promedio_dias(30, ahora) == pytest.approx(b.promedio_dias(30, ahora))
+
+
+def test_indice_sigue_delete_rename_y_reset():
+    s = storage.Store.in_memory()
+    indice = trends.TrendIndex.attach(s)
+    for i, n in enumerate([5.0, 3.0, 6.5, 4.0, 7.0, 2.5]):
+        s.add_evaluacion(n, ramo="Historia", fecha=f"2026-03-{i + 1:02d}T10:00:00")
+    s.delete_evaluacion(2, ramo="Historia")
+    _igual_a_reconstruido(indice, s)
+
+    s.rename_ramo("Historia", "Historia Universal")
+    assert indice.ramo("Historia Universal").count() == 5
+    _igual_a_reconstruido(indice, s)
+
+    # cambio por fuera del store (ej: sync o archivo editado): llega como reset
+    data = s.load_data()
+    data["ramos"]["Lenguaje"]["evaluaciones"] = [{"nota": 6.0, "fecha": "2026-03-20T10:00:00"}]
+    s.save_data(data)
+    s._emit({"tipo": "reset", "data": s.load_data()})
+    _igual_a_reconstruido(indice, s)
+    assert indice.ramo("Lenguaje").count() == 1
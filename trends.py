@@ -0,0 +1,169 @@
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import datetime
+from typing import Optional, Tuple, List, Dict
+
+import storage
+
+# =========================
+# Tendencias por ramo, actualizadas al agregar (no en cada refresh):
+# - promedio móvil y pendiente de las últimas N evaluaciones: O(1) por nota
+# - promedio de los últimos D días: O(log n) por consulta, O(1) al agregar
+#   en orden cronológico (lo normal); una nota con fecha atrasada cuesta O(n)
+# Borrar/limpiar rehace el ramo, que es raro comparado con agregar.
+# =========================
+VENTANA_DEFAULT = 5
+DIA = 86400.0
+
+def _ts(ev: dict) -> Optional[float]:
+    f = ev.get("fecha")
+    if not f:
+        return None
+    try:
+        return datetime.fromisoformat(f).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+class RamoTrend:
+    def __init__(self, ventana: int = VENTANA_DEFAULT):
+        self.ventana = max(2, int(ventana))
+        self._evs: List[Tuple[Optional[float], float]] = []  # (ts, nota) en el orden del ramo
+        # ventana de las últimas N: x = número de evaluación
+        self._win: deque = deque()
+        self._x = 0
+        self._sx = self._sy = self._sxx = self._sxy = 0.0
+        # por tiempo: ts ordenados + sumas acumuladas de notas
+        self._t: List[float] = []
+        self._notas_t: List[float] = []
+        self._pref: List[float] = [0.0]
+
+    @classmethod
+    def from_evs(cls, evs: List[Dict], ventana: int = VENTANA_DEFAULT) -> "RamoTrend":
+        tr = cls(ventana)
+        for ev in evs:
+            tr.add(float(ev["nota"]), _ts(ev))
+        return tr
+
+    def add(self, nota: float, ts: Optional[float] = None) -> None:
+        self._evs.append((ts, nota))
+
+        x = float(self._x)
+        self._x += 1
+        self._win.append((x, nota))
+        self._sx += x
+        self._sy += nota
+        self._sxx += x * x
+        self._sxy += x * nota
+        if len(self._win) > self.ventana:
+            ox, on = self._win.popleft()
+            self._sx -= ox
+            self._sy -= on
+            self._sxx -= ox * ox
+            self._sxy -= ox * on
+
+        if ts is None:
+            return
+        if not self._t or ts >= self._t[-1]:
+            self._t.append(ts)
+            self._notas_t.append(nota)
+            self._pref.append(self._pref[-1] + nota)
+        else:
+            i = bisect_right(self._t, ts)
+            self._t.insert(i, ts)
+            self._notas_t.insert(i, nota)
+            del self._pref[i + 1:]
+            for n in self._notas_t[i:]:
+                self._pref.append(self._pref[-1] + n)
+
+    def sin(self, idx: int) -> "RamoTrend":
+        """Copia rehecha sin la evaluación idx (para borrar)."""
+        tr = RamoTrend(self.ventana)
+        for i, (ts, nota) in enumerate(self._evs):
+            if i != idx:
+                tr.add(nota, ts)
+        return tr
+
+    # ---------- consultas ----------
+    def count(self) -> int:
+        return len(self._evs)
+
+    def promedio_movil(self) -> Optional[float]:
+        """Promedio simple de las últimas N evaluaciones."""
+        if not self._win:
+            return None
+        return self._sy / len(self._win)
+
+    def pendiente(self) -> Optional[float]:
+        """Cuánto sube (o baja) la nota por evaluación, en las últimas N."""
+        n = len(self._win)
+        if n < 2:
+            return None
+        den = n * self._sxx - self._sx * self._sx
+        if den == 0:
+            return None
+        return (n * self._sxy - self._sx * self._sy) / den
+
+    def promedio_dias(self, dias: float, ahora: Optional[float] = None) -> Tuple[Optional[float], int]:
+        """(promedio, cantidad) de las evaluaciones con fecha en los últimos `dias`."""
+        ahora = datetime.now().timestamp() if ahora is None else ahora
+        i = bisect_left(self._t, ahora - dias * DIA)
+        j = bisect_right(self._t, ahora)
+        n = j - i
+        if n == 0:
+            return None, 0
+        return (self._pref[j] - self._pref[i]) / n, n
+
+class TrendIndex:
+    """Un RamoTrend por ramo, sincronizado con los eventos del store."""
+
+    def __init__(self, ventana: int = VENTANA_DEFAULT):
+        self.ventana = ventana
+        self._por_ramo: Dict[str, RamoTrend] = {}
+        self._store: Optional[storage.Store] = None
+
+    @classmethod
+    def from_data(cls, data: dict, ventana: int = VENTANA_DEFAULT) -> "TrendIndex":
+        idx = cls(ventana)
+        idx.rebuild(data)
+        return idx
+
+    @classmethod
+    def attach(cls, store: Optional[storage.Store] = None, ventana: int = VENTANA_DEFAULT) -> "TrendIndex":
+        store = store or storage.default_store()
+        idx = cls.from_data(store.load_data(), ventana)
+        idx._store = store
+        store.subscribe(idx.on_evento)
+        return idx
+
+    def detach(self) -> None:
+        if self._store is not None:
+            self._store.unsubscribe(self.on_evento)
+            self._store = None
+
+    def rebuild(self, data: dict) -> None:
+        self._por_ramo = {
+            r: RamoTrend.from_evs(obj.get("evaluaciones", []), self.ventana)
+            for r, obj in data.get("ramos", {}).items()
+        }
+
+    def on_evento(self, evento: dict) -> None:
+        tipo = evento.get("tipo")
+        r = evento.get("ramo")
+        if tipo == "add_evaluacion":
+            ev = evento["ev"]
+            self.ramo(r).add(float(ev["nota"]), _ts(ev))
+        elif tipo == "delete_evaluacion":
+            self._por_ramo[r] = self.ramo(r).sin(evento["idx"])
+        elif tipo in ("clear_evaluaciones", "add_ramo"):
+            self._por_ramo[r] = RamoTrend(self.ventana)
+        elif tipo == "rename_ramo":
+            self._por_ramo[evento["nuevo"]] = self._por_ramo.pop(r, RamoTrend(self.ventana))
+        elif tipo == "delete_ramo":
+            self._por_ramo.pop(r, None)
+        elif tipo == "reset":
+            self.rebuild(evento["data"])
+
+    def ramo(self, ramo: str) -> RamoTrend:
+        if ramo not in self._por_ramo:
+            self._por_ramo[ramo] = RamoTrend(self.ventana)
+        return self._por_ramo[ramo]